@@ -0,0 +1,4 @@
+"""SalesIQ agent: CrewAI configuration, scratchpad and CLI entrypoint."""
+
+# Crew modes accepted by agent.config.create_crew
+CREW_MODES = ("investigation", "sales")
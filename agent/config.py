@@ -1,7 +1,8 @@
 """Configuration for the CrewAI agent."""
 
 import os
-import sys
+from functools import lru_cache
+from string import Template
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew, Process
@@ -9,8 +10,7 @@ from crewai.memory import EntityMemory
 from langchain_google_genai import ChatGoogleGenerativeAI
 import google.generativeai as genai
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent import CREW_MODES
 from tools.run_sql import SQLTool
 from tools.get_schema import SchemaTool
 from tools.summarizer import SummarizerTool
@@ -18,9 +18,31 @@ from tools.summarizer import SummarizerTool
 # Load environment variables
 load_dotenv()
 
-# Configure Google API
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-llm = ChatGoogleGenerativeAI(model="gemini-pro", google_api_key=os.getenv('GEMINI_API_KEY'))
+# Maximum number of investigation subtasks the crew runs concurrently
+MAX_PARALLEL_AGENTS = int(os.getenv("CREWAI_MAX_PARALLEL_AGENTS", "3"))
+
+
+@lru_cache(maxsize=1)
+def get_llm() -> ChatGoogleGenerativeAI:
+    """
+    Return the Gemini chat model shared by all agents.
+    
+    The Google API is configured on first use rather than at import time.
+    
+    Returns:
+        ChatGoogleGenerativeAI: Gemini chat model
+    """
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+    
+    # Configure Google API
+    genai.configure(api_key=api_key)
+    return ChatGoogleGenerativeAI(
+        model="gemini-pro",
+        google_api_key=api_key
+    )
+
 
 # Define agent roles and personas
 AGENT_ROLES = {
@@ -65,19 +87,107 @@ AGENT_ROLES = {
 }
 
 
-def create_data_analyst_agent() -> Agent:
-    """Create a data analyst agent with database tools."""
-    sql_tool = SQLTool()
+# Task description templates, filled in with $query and $context_block
+SALES_ANALYSIS_TEMPLATE = Template("""
+    Analyze the sales data to answer: "$query"
+    
+    Follow these steps:
+    1. Understand the database schema and table relationships
+    2. Write and execute SQL queries to investigate the data
+    3. Identify patterns, trends, and anomalies
+    4. Provide a clear, structured analysis
+    
+    IMPORTANT:
+    - Be data-driven - support all conclusions with data
+    - Consider multiple dimensions (time, region, product, etc.)
+    - Look for both positive and negative trends
+    - Validate findings through multiple queries
+    $context_block""")
+
+SCHEMA_TASK_TEMPLATE = Template("""
+    Map the parts of the database schema needed to answer: "$query"
+    
+    Identify the relevant tables, their key columns and how they join.
+    Do not analyze the data itself.
+    $context_block""")
+
+METRIC_QUERY_TEMPLATE = Template("""
+    Write and execute SQL queries that extract the key metrics over time for: "$query"
+    
+    IMPORTANT:
+    - Break metrics down by time and by the dimensions mentioned in the query
+    - Report the actual numbers returned, not just the queries
+    $context_block""")
+
+ANOMALY_QUERY_TEMPLATE = Template("""
+    Write and execute SQL queries that look for anomalies related to: "$query"
+    
+    IMPORTANT:
+    - Compare recent periods against earlier baselines
+    - Consider multiple dimensions (time, region, product, platform, device, etc.)
+    - Quantify every anomaly you find
+    $context_block""")
+
+# Investigation subtasks as (description template, expected output)
+INVESTIGATION_SUBTASKS = (
+    (SCHEMA_TASK_TEMPLATE, "The tables, columns and join paths relevant to the query."),
+    (
+        METRIC_QUERY_TEMPLATE,
+        "The relevant metrics over time, with the queries and numbers that support them."
+    ),
+    (ANOMALY_QUERY_TEMPLATE, "The anomalies found, when they occurred and how large they are.")
+)
+
+
+@lru_cache(maxsize=1)
+def _get_sql_tool() -> SQLTool:
+    """Return the shared SQL tool instance."""
+    return SQLTool()
+
+
+@lru_cache(maxsize=1)
+def _get_schema_tool() -> SchemaTool:
+    """Return the shared schema tool instance with its schema cache pre-warmed."""
     schema_tool = SchemaTool()
-    summarizer_tool = SummarizerTool()
+    schema_tool.warm_cache()
+    return schema_tool
+
+
+@lru_cache(maxsize=1)
+def _get_summarizer_tool() -> SummarizerTool:
+    """Return the shared summarizer tool instance."""
+    return SummarizerTool()
+
+
+@lru_cache(maxsize=1)
+def _get_entity_memory() -> EntityMemory:
+    """Return the entity memory shared by every crew that enables memory."""
+    return EntityMemory()
+
+
+@lru_cache(maxsize=None)
+def create_data_analyst_agent(worker: int = 0, verbose: bool = False) -> Agent:
+    """
+    Create a data analyst agent with database tools.
+    
+    Args:
+        worker: Index of the analyst; subtasks running concurrently each
+            need their own agent instance
+        verbose: Whether CrewAI logs the agent's intermediate steps
+        
+    Returns:
+        Agent: CrewAI data analyst agent
+    """
+    sql_tool = _get_sql_tool()
+    schema_tool = _get_schema_tool()
+    summarizer_tool = _get_summarizer_tool()
     
     return Agent(
         role=AGENT_ROLES["data_analyst"]["name"],
         goal=AGENT_ROLES["data_analyst"]["goal"],
         backstory=AGENT_ROLES["data_analyst"]["backstory"],
-        verbose=True,
+        verbose=verbose,
         allow_delegation=True,
-        memory=EntityMemory(),
         tools=[
             sql_tool.run,
             schema_tool.get_tables,
@@ -86,35 +196,51 @@ def create_data_analyst_agent() -> Agent:
             summarizer_tool.summarize,
             summarizer_tool.analyze_metrics
         ],
-        llm=llm
+        llm=get_llm()
     )
 
 
-def create_business_analyst_agent() -> Agent:
-    """Create a business analyst agent with analysis tools."""
-    sql_tool = SQLTool()
-    summarizer_tool = SummarizerTool()
+@lru_cache(maxsize=None)
+def create_business_analyst_agent(verbose: bool = False) -> Agent:
+    """
+    Create a business analyst agent with analysis tools.
+    
+    Args:
+        verbose: Whether CrewAI logs the agent's intermediate steps
+        
+    Returns:
+        Agent: CrewAI business analyst agent
+    """
+    sql_tool = _get_sql_tool()
+    summarizer_tool = _get_summarizer_tool()
     
     return Agent(
         role=AGENT_ROLES["business_analyst"]["name"],
         goal=AGENT_ROLES["business_analyst"]["goal"],
         backstory=AGENT_ROLES["business_analyst"]["backstory"],
-        verbose=True,
+        verbose=verbose,
         allow_delegation=True,
-        memory=EntityMemory(),
         tools=[
             sql_tool.run,
             summarizer_tool.summarize,
             summarizer_tool.analyze_metrics,
             summarizer_tool.investigate_anomaly
         ],
-        llm=llm
+        llm=get_llm()
     )
 
 
+def _format_context(context: Optional[Dict[str, Any]]) -> str:
+    """Format optional context information as a block for a task description."""
+    if not context:
+        return ""
+    return "\n\nAdditional context:\n" + "".join(f"- {key}: {value}\n" for key, value in context.items())
+
+
 def create_sales_analysis_task(
     user_query: str,
-    context: Optional[Dict[str, Any]] = None
+    context: Optional[Dict[str, Any]] = None,
+    verbose: bool = False
 ) -> Task:
     """
     Create a task for analyzing sales data.
@@ -122,46 +248,71 @@ def create_sales_analysis_task(
     Args:
         user_query: User's analysis query
         context: Optional context information
+        verbose: Whether the assigned agent logs its intermediate steps
         
     Returns:
         Task: CrewAI task for analysis
     """
-    # Define the task description based on user query
-    task_description = f"""
-    Analyze the sales data to answer: "{user_query}"
-    
-    Follow these steps:
-    1. Understand the database schema and table relationships
-    2. Write and execute SQL queries to investigate the data
-    3. Identify patterns, trends, and anomalies
-    4. Provide a clear, structured analysis
-    
-    IMPORTANT:
-    - Be data-driven - support all conclusions with data
-    - Consider multiple dimensions (time, region, product, etc.)
-    - Look for both positive and negative trends
-    - Validate findings through multiple queries
-    """
-    
-    # Add any context if provided
-    if context:
-        context_str = "\n\nAdditional context:\n"
-        for key, value in context.items():
-            context_str += f"- {key}: {value}\n"
-        task_description += context_str
+    # Define the task description based on user query and context
+    task_description = SALES_ANALYSIS_TEMPLATE.substitute(
+        query=user_query,
+        context_block=_format_context(context)
+    )
     
     return Task(
         description=task_description,
         expected_output="A comprehensive analysis of the sales data with findings and evidence.",
-        agent=create_data_analyst_agent(),
+        agent=create_data_analyst_agent(verbose=verbose),
         context=context or {}
     )
 
 
-def create_business_interpretation_task() -> Task:
+def create_investigation_tasks(
+    user_query: str,
+    context: Optional[Dict[str, Any]] = None,
+    max_parallel_agents: int = MAX_PARALLEL_AGENTS,
+    verbose: bool = False
+) -> List[Task]:
+    """
+    Create independent data-gathering subtasks for an investigation.
+    
+    The subtasks share no context with each other, so up to
+    max_parallel_agents of them run concurrently, each on its own
+    data analyst agent.
+    
+    Args:
+        user_query: User's analysis query
+        context: Optional context information
+        max_parallel_agents: Maximum number of subtasks to run concurrently
+        verbose: Whether the assigned agents log their intermediate steps
+        
+    Returns:
+        list: CrewAI tasks for the investigation
+    """
+    context_block = _format_context(context)
+    
+    return [
+        Task(
+            description=template.substitute(query=user_query, context_block=context_block),
+            expected_output=expected_output,
+            agent=create_data_analyst_agent(i, verbose),
+            async_execution=i < max_parallel_agents
+        )
+        for i, (template, expected_output) in enumerate(INVESTIGATION_SUBTASKS)
+    ]
+
+
+def create_business_interpretation_task(
+    context_tasks: Optional[List[Task]] = None,
+    verbose: bool = False
+) -> Task:
     """
     Create a task for business interpretation of the analysis.
     
+    Args:
+        context_tasks: Optional analysis tasks whose outputs feed the interpretation
+        verbose: Whether the assigned agent logs its intermediate steps
+        
     Returns:
         Task: CrewAI task for business interpretation
     """
@@ -183,35 +334,60 @@ def create_business_interpretation_task() -> Task:
         Your output should be immediately actionable for product managers.
         """,
         expected_output="Business-focused insights and recommendations based on the data analysis.",
-        agent=create_business_analyst_agent()
+        agent=create_business_analyst_agent(verbose),
+        context=context_tasks
     )
 
 
-def create_crew(user_query: str, context: Optional[Dict[str, Any]] = None) -> Crew:
+def create_crew(
+    user_query: str,
+    context: Optional[Dict[str, Any]] = None,
+    mode: str = "investigation",
+    max_parallel_agents: int = MAX_PARALLEL_AGENTS,
+    memory: bool = False,
+    verbose: bool = False
+) -> Crew:
     """
     Create a crew of agents to analyze sales data.
     
+    In "investigation" mode the data-gathering subtasks fan out across data
+    analyst agents; in "sales" mode a single combined analysis task is used.
+    Either way the business interpretation task fans the analysis back in.
+    
     Args:
         user_query: User's analysis query
         context: Optional context information
+        mode: Crew mode, one of CREW_MODES
+        max_parallel_agents: Maximum number of subtasks to run concurrently
+        memory: Whether the crew keeps entity memory; when enabled, one
+            EntityMemory instance is shared across all crews
+        verbose: Whether CrewAI logs intermediate prompts and tool calls
         
     Returns:
         Crew: CrewAI crew for analysis
     """
     # Create the tasks
-    analysis_task = create_sales_analysis_task(user_query, context)
-    interpretation_task = create_business_interpretation_task()
+    if mode == "investigation":
+        analysis_tasks = create_investigation_tasks(user_query, context, max_parallel_agents, verbose)
+    elif mode == "sales":
+        analysis_tasks = [create_sales_analysis_task(user_query, context, verbose)]
+    else:
+        raise ValueError(f"Unknown crew mode '{mode}', expected one of: {', '.join(CREW_MODES)}")
+    interpretation_task = create_business_interpretation_task(analysis_tasks, verbose)
+    tasks = analysis_tasks + [interpretation_task]
     
-    # Create the crew with sequential process
+    # Collect the distinct agents assigned to the tasks
+    agents = list({id(task.agent): task.agent for task in tasks}.values())
+    
+    # Create the crew with sequential process; async subtasks run concurrently
+    # until the interpretation task waits on their outputs
     crew = Crew(
-        agents=[
-            create_data_analyst_agent(),
-            create_business_analyst_agent()
-        ],
-        tasks=[analysis_task, interpretation_task],
-        verbose=2,
+        agents=agents,
+        tasks=tasks,
+        verbose=verbose,
         process=Process.sequential,
-        memory=EntityMemory()
+        memory=memory,
+        entity_memory=_get_entity_memory() if memory else None
     )
     
-    return crew 
\ No newline at end of file
+    return crew
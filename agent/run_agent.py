@@ -2,42 +2,43 @@
 
 import os
 import sys
+import asyncio
 import argparse
 import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from agent.config import create_crew
+# CrewAI, LangChain and the Gemini SDK are imported where a crew is built,
+# so --help, --test-connection and argument errors return quickly
+from agent import CREW_MODES
 from agent.scratchpad import Scratchpad
 from db.connection import test_connection
 
+# Environment variables the agent needs, with their descriptions
+REQUIRED_VARS = (
+    ("GEMINI_API_KEY", "API key for Google Gemini"),
+    ("DB_NAME", "Database name"),
+    ("DB_USER", "Database user"),
+    ("DB_PASSWORD", "Database password"),
+    ("DB_HOST", "Database host"),
+    ("DB_PORT", "Database port")
+)
+
+# Characters of the crew result written per call when saving a report
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
 
 def validate_environment():
     """Check if all required environment variables are set."""
-    required_vars = [
-        ("GEMINI_API_KEY", "API key for Google Gemini"),
-        ("DB_NAME", "Database name"),
-        ("DB_USER", "Database user"),
-        ("DB_PASSWORD", "Database password"),
-        ("DB_HOST", "Database host"),
-        ("DB_PORT", "Database port")
-    ]
-    
-    missing = []
-    for var, description in required_vars:
-        if not os.getenv(var):
-            missing.append((var, description))
-    
-    if missing:
-        print("ERROR: Missing required environment variables:")
-        for var, description in missing:
-            print(f"  - {var}: {description}")
-        print("\nPlease set these variables in your .env file or environment.")
-        return False
-    
-    return True
+    missing = [(var, description) for var, description in REQUIRED_VARS if not os.environ.get(var)]
+    if not missing:
+        return True
+    
+    print("ERROR: Missing required environment variables:")
+    for var, description in missing:
+        print(f"  - {var}: {description}")
+    print("\nPlease set these variables in your .env file or environment.")
+    return False
 
 
 def parse_arguments():
@@ -53,6 +54,19 @@ def parse_arguments():
         help="The investigation query (e.g., 'Investigate CTR drop for Campaign 5')"
     )
     
+    parser.add_argument(
+        "--queries-file",
+        type=str,
+        help="Investigate every query in this file (one per line), reusing the same crew"
+    )
+    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of queries from --queries-file to investigate at the same time"
+    )
+    
     parser.add_argument(
         "--output",
         "-o",
@@ -73,6 +87,20 @@ def parse_arguments():
         help="Test database connection and exit"
     )
     
+    parser.add_argument(
+        "--mode",
+        "-m",
+        choices=CREW_MODES,
+        default="investigation",
+        help="Crew mode: parallel investigation subtasks or a single sales analysis task"
+    )
+    
+    parser.add_argument(
+        "--enable-memory",
+        action="store_true",
+        help="Give the crew entity memory shared across its runs (off by default)"
+    )
+    
     parser.add_argument(
         "--context",
         "-c",
@@ -88,30 +116,30 @@ def parse_context(context_str: str) -> Dict[str, str]:
     if not context_str:
         return {}
     
-    context = {}
-    pairs = context_str.split(",")
-    
-    for pair in pairs:
-        if "=" in pair:
-            key, value = pair.split("=", 1)
-            context[key.strip()] = value.strip()
-    
-    return context
+    # Pairs without an "=" have an empty separator and are skipped
+    return {
+        key.strip(): value.strip()
+        for key, sep, value in (pair.partition("=") for pair in context_str.split(","))
+        if sep
+    }
 
 
-def run_investigation(query: str, context: Optional[Dict[str, Any]] = None, verbose: bool = False):
-    """
-    Run an investigation using the CrewAI agent.
-    
-    Args:
-        query: User's investigation query
-        context: Optional context information
-        verbose: Whether to enable verbose output
-    
-    Returns:
-        tuple: (Scratchpad instance, crew result)
-    """
-    # Create scratchpad for tracking the investigation
+def _preview(text: str, limit: int) -> str:
+    """Return text cut to at most limit characters, marking any cut with an ellipsis."""
+    return text if len(text) <= limit else f"{text[:limit]}…"
+
+
+def read_queries(path: str) -> List[str]:
+    """Read one query per line from a file, skipping blank lines and # comments."""
+    with open(path, 'r') as f:
+        return [
+            line.strip() for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+def _start_scratchpad(query: str, context: Optional[Dict[str, Any]] = None) -> Scratchpad:
+    """Create the scratchpad for an investigation and log its start."""
     scratchpad = Scratchpad()
     scratchpad.add_context("query", query)
     if context:
@@ -124,74 +152,22 @@ def run_investigation(query: str, context: Optional[Dict[str, Any]] = None, verb
         description=f"Starting investigation: {query}",
         details={"context": context or {}}
     )
-    
-    # Create crew for the investigation
-    crew = create_crew(query, context)
-    
-    # Add hooks for logging actions if verbose
-    if verbose:
-        def on_agent_start(agent):
-            print(f"\n[{agent.role}] Starting work...")
-            scratchpad.log_action(
-                action_type="agent_start",
-                description=f"Agent {agent.role} starting work",
-                details={"agent": agent.role}
-            )
-        
-        def on_agent_end(agent, result):
-            print(f"\n[{agent.role}] Completed work")
-            scratchpad.log_action(
-                action_type="agent_end",
-                description=f"Agent {agent.role} completed work",
-                details={
-                    "agent": agent.role,
-                    "result_preview": result[:100] + "..." if len(result) > 100 else result
-                }
-            )
-            
-            # Try to extract findings from the result
-            if "finding" in result.lower() or "anomaly" in result.lower():
-                lines = result.split("\n")
-                for line in lines:
-                    if line.strip().startswith(("#", "##", "###")) and len(line) > 2:
-                        title = line.strip("#").strip()
-                        scratchpad.log_finding(
-                            title=title,
-                            description="(Extracted from agent output)",
-                            importance="medium"
-                        )
-        
-        crew.on_agent_start(on_agent_start)
-        crew.on_agent_end(on_agent_end)
-    
-    # Run the crew
-    print(f"\n{'='*60}\nINVESTIGATING: {query}\n{'='*60}\n")
-    result = crew.kickoff()
-    
+    return scratchpad
+
+
+def _record_result(scratchpad: Scratchpad, result: str) -> None:
+    """Log the crew result and its findings to the scratchpad."""
     # Log the final result
     scratchpad.log_action(
         action_type="investigation_complete",
         description="Investigation completed",
-        details={"result_preview": result[:200] + "..." if len(result) > 200 else result}
+        details={"result_preview": _preview(result, 200)}
     )
     
-    # Extract key findings from the result
+    # Extract key findings from the markdown sections of the result
     extraction_completed = False
     try:
-        # Simple extraction logic - look for sections in markdown
-        sections = result.split("\n## ")
-        for section in sections:
-            if section.lower().startswith(("finding", "anomal", "cause", "result")):
-                lines = section.split("\n")
-                title = lines[0].strip()
-                description = "\n".join(lines[1:]).strip()
-                
-                scratchpad.log_finding(
-                    title=title,
-                    description=description,
-                    importance="high"
-                )
-                extraction_completed = True
+        extraction_completed = scratchpad.log_markdown_findings(result) > 0
     except Exception as e:
         print(f"Error extracting findings: {e}")
     
@@ -202,22 +178,204 @@ def run_investigation(query: str, context: Optional[Dict[str, Any]] = None, verb
             description=result,
             importance="medium"
         )
+
+
+def _attach_verbose_hooks(crew: Any, scratchpad: Scratchpad) -> None:
+    """Print a crew's agent starts and completions and log them to the scratchpad."""
+    def on_agent_start(agent):
+        print(f"\n[{agent.role}] Starting work...")
+        scratchpad.log_action(
+            action_type="agent_start",
+            description=f"Agent {agent.role} starting work",
+            details={"agent": agent.role}
+        )
+    
+    def on_agent_end(agent, result):
+        print(f"\n[{agent.role}] Completed work")
+        scratchpad.log_action(
+            action_type="agent_end",
+            description=f"Agent {agent.role} completed work",
+            details={
+                "agent": agent.role,
+                "result_preview": _preview(result, 100)
+            }
+        )
+    
+    crew.on_agent_start(on_agent_start)
+    crew.on_agent_end(on_agent_end)
+
+
+def run_investigation(
+    query: str,
+    context: Optional[Dict[str, Any]] = None,
+    verbose: bool = False,
+    mode: str = "investigation",
+    crew: Optional[Any] = None,
+    memory: bool = False
+):
+    """
+    Run an investigation using the CrewAI agent.
+    
+    Args:
+        query: User's investigation query
+        context: Optional context information
+        verbose: Whether to enable verbose output
+        mode: Crew mode to run (see agent.config.CREW_MODES)
+        crew: Optional prebuilt crew whose tasks take the query as a
+            "{query}" input; it is copied for this run, and a new crew is
+            created when omitted
+        memory: Whether a newly created crew keeps entity memory
+    
+    Returns:
+        tuple: (Scratchpad instance, crew result)
+    """
+    from agent.config import create_crew
+    
+    # Create scratchpad for tracking the investigation
+    scratchpad = _start_scratchpad(query, context)
+    
+    # Create crew for the investigation, or copy the shared one so task
+    # outputs and agent state don't carry over between queries
+    inputs = None
+    if crew is None:
+        crew = create_crew(query, context, mode=mode, memory=memory, verbose=verbose)
+    else:
+        crew = crew.copy()
+        inputs = {"query": query}
+    
+    # Add hooks for logging actions if verbose
+    if verbose:
+        _attach_verbose_hooks(crew, scratchpad)
+    
+    # Run the crew
+    print(f"\n{'='*60}\nINVESTIGATING: {query}\n{'='*60}\n")
+    result = str(crew.kickoff(inputs=inputs))
     
+    _record_result(scratchpad, result)
     return scratchpad, result
 
 
+def run_investigations(
+    queries: List[str],
+    context: Optional[Dict[str, Any]] = None,
+    verbose: bool = False,
+    mode: str = "investigation",
+    concurrency: int = 1,
+    memory: bool = False
+) -> List[Tuple[Scratchpad, str]]:
+    """
+    Run several investigations on one crew built up front.
+    
+    Every query runs on its own copy of the crew; with a concurrency above
+    1, up to that many of them run at the same time.
+    
+    Args:
+        queries: User's investigation queries
+        context: Optional context information shared by all queries
+        verbose: Whether to enable verbose output
+        mode: Crew mode to run (see agent.config.CREW_MODES)
+        concurrency: Maximum number of investigations to run at the same time
+        memory: Whether the crew keeps entity memory
+    
+    Returns:
+        list: (Scratchpad instance, crew result) tuples in query order
+    """
+    from agent.config import create_crew
+    
+    # CrewAI fills in the {query} placeholder from the kickoff inputs
+    crew = create_crew("{query}", context, mode=mode, memory=memory, verbose=verbose)
+    
+    if concurrency <= 1:
+        return [
+            run_investigation(query, context, verbose, mode, crew=crew)
+            for query in queries
+        ]
+    
+    async def investigate(query: str, semaphore: asyncio.Semaphore) -> Tuple[Scratchpad, str]:
+        async with semaphore:
+            scratchpad = _start_scratchpad(query, context)
+            run_crew = crew.copy()
+            if verbose:
+                _attach_verbose_hooks(run_crew, scratchpad)
+            print(f"\n{'='*60}\nINVESTIGATING: {query}\n{'='*60}\n")
+            result = str(await run_crew.kickoff_async(inputs={"query": query}))
+            _record_result(scratchpad, result)
+            return scratchpad, result
+    
+    async def investigate_all() -> List[Tuple[Scratchpad, str]]:
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(investigate(query, semaphore) for query in queries))
+    
+    return asyncio.run(investigate_all())
+
+
+def _chunks(text: str, size: int) -> Iterator[str]:
+    """Yield consecutive slices of text of at most size characters."""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def save_results(path: str, query: str, scratchpad: Scratchpad, result: str) -> None:
+    """
+    Save an investigation to a file.
+    
+    Args:
+        path: Output file; a .json extension saves the scratchpad as JSON,
+            .jsonl saves one action or finding per line,
+            anything else saves a markdown report
+        query: User's investigation query
+        scratchpad: Scratchpad of the investigation
+        result: Crew result
+    """
+    # Determine file extension
+    _, ext = os.path.splitext(path)
+    
+    if ext.lower() == '.json':
+        # Save as JSON
+        scratchpad.save_to_file(path)
+    elif ext.lower() == '.jsonl':
+        # Save as JSON Lines, one action or finding per line
+        scratchpad.save_to_jsonl(path)
+    else:
+        # Save as text file with report + result, written as it is produced
+        with open(path, 'w') as f:
+            # Write timestamp
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"# SalesIQ Investigation Report: {query}", file=f)
+            print(f"Generated: {timestamp}\n", file=f)
+            
+            # Write summary
+            summary = scratchpad.get_summary()
+            print("## Summary", file=f)
+            print(f"- Duration: {summary['duration_seconds']:.2f} seconds", file=f)
+            print(f"- Actions: {summary['action_count']}", file=f)
+            print(f"- Findings: {summary['finding_count']}\n", file=f)
+            
+            # Write key findings
+            print("## Key Findings\n", file=f)
+            findings = scratchpad.get_findings(min_importance="high")
+            for i, finding in enumerate(findings):
+                print(f"### {i+1}. {finding['title']}", file=f)
+                print(finding['description'], end="\n\n", file=f)
+            
+            # Write detailed results in fixed-size chunks
+            print("## Detailed Results\n", file=f)
+            for chunk in _chunks(result, OUTPUT_CHUNK_SIZE):
+                f.write(chunk)
+
+
 def main():
     """Main CLI entrypoint."""
     # Load environment variables
     load_dotenv()
     
+    # Parse arguments
+    args = parse_arguments()
+    
     # Validate environment
     if not validate_environment():
         sys.exit(1)
     
-    # Parse arguments
-    args = parse_arguments()
-    
     # Test database connection if requested
     if args.test_connection:
         print("Testing database connection...")
@@ -228,9 +386,14 @@ def main():
             print("Failed to connect to the database. Check your connection settings.")
             sys.exit(1)
     
+    # Collect the queries to investigate
+    queries = [args.query] if args.query else []
+    if args.queries_file:
+        queries.extend(read_queries(args.queries_file))
+    
     # Check if a query was provided
-    if not args.query:
-        print("ERROR: Please provide an investigation query.")
+    if not queries:
+        print("ERROR: Please provide an investigation query or a --queries-file.")
         print("Example: python -m agent.run_agent \"Investigate CTR drop for Campaign 5\"")
         sys.exit(1)
     
@@ -238,53 +401,35 @@ def main():
     context = parse_context(args.context) if args.context else None
     
     try:
-        # Run the investigation
-        scratchpad, result = run_investigation(args.query, context, args.verbose)
-        
-        # Print the report
-        scratchpad.print_report()
-        
-        # Print the detailed result
-        print("\n## DETAILED RESULTS\n")
-        print(result)
+        # Run the investigations, sharing one crew when there are several
+        if len(queries) == 1:
+            runs = [run_investigation(
+                queries[0], context, args.verbose, args.mode, memory=args.enable_memory
+            )]
+        else:
+            runs = run_investigations(
+                queries, context, args.verbose, args.mode, args.concurrency,
+                memory=args.enable_memory
+            )
         
-        # Save results to file if specified
-        if args.output:
-            print(f"\nSaving results to {args.output}...")
-            
-            # Determine file extension
-            _, ext = os.path.splitext(args.output)
+        for i, (query, (scratchpad, result)) in enumerate(zip(queries, runs), 1):
+            # Print the report
+            scratchpad.print_report()
             
-            if ext.lower() == '.json':
-                # Save as JSON
-                scratchpad.save_to_file(args.output)
-            else:
-                # Save as text file with report + result
-                with open(args.output, 'w') as f:
-                    # Write timestamp
-                    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    f.write(f"# SalesIQ Investigation Report: {args.query}\n")
-                    f.write(f"Generated: {timestamp}\n\n")
-                    
-                    # Write summary
-                    summary = scratchpad.get_summary()
-                    f.write(f"## Summary\n")
-                    f.write(f"- Duration: {summary['duration_seconds']:.2f} seconds\n")
-                    f.write(f"- Actions: {summary['action_count']}\n")
-                    f.write(f"- Findings: {summary['finding_count']}\n\n")
-                    
-                    # Write key findings
-                    f.write("## Key Findings\n\n")
-                    findings = scratchpad.get_findings(min_importance="high")
-                    for i, finding in enumerate(findings):
-                        f.write(f"### {i+1}. {finding['title']}\n")
-                        f.write(f"{finding['description']}\n\n")
-                    
-                    # Write detailed results
-                    f.write("## Detailed Results\n\n")
-                    f.write(result)
+            # Print the detailed result
+            print("\n## DETAILED RESULTS\n")
+            print(result)
             
-            print(f"Results saved to {args.output}")
+            # Save results to file if specified, numbering the files for multiple queries
+            if args.output:
+                output_path = args.output
+                if len(queries) > 1:
+                    root, ext = os.path.splitext(args.output)
+                    output_path = f"{root}_{i}{ext}"
+                
+                print(f"\nSaving results to {output_path}...")
+                save_results(output_path, query, scratchpad, result)
+                print(f"Results saved to {output_path}")
         
     except Exception as e:
         print(f"ERROR: {e}")
@@ -292,4 +437,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
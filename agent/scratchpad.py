@@ -1,8 +1,58 @@
 """In-memory scratchpad for agent to log actions and findings."""
 
-from typing import Dict, List, Any, Optional
+from typing import BinaryIO, Dict, List, Any, Iterator, Optional, Tuple
+from array import array
 import datetime
-import json
+import orjson
+
+# orjson options shared by every serialization path; datetimes such as the
+# log timestamps are written natively as ISO 8601 strings
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Buffer size for file output
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Numeric rank of each importance level; unknown levels rank as "low"
+_IMP = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# Columns of the finding store, in the order of a finding dict
+_FINDING_FIELDS = ("timestamp", "title", "description", "importance", "related_actions", "evidence")
+
+# Heading prefixes that mark a "## " section as a finding
+FINDING_KEYWORDS = ("finding", "anomal", "cause", "result")
+
+
+def _rank(importance: str) -> int:
+    """Return the numeric rank of an importance level."""
+    return _IMP.get(importance.lower(), 0)
+
+
+def _iter_sections(text: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yield the (heading, body) pairs of the "## " sections of a markdown text.
+    
+    The text is scanned once, line by line; deeper headings stay in the body
+    of the section that contains them.
+    
+    Args:
+        text: Markdown text to scan
+        
+    Yields:
+        tuple: Section heading and stripped section body
+    """
+    title = None
+    body: List[str] = []
+    for line in text.splitlines():
+        if line.startswith(("## ", "##\t")):
+            if title is not None:
+                yield title, "\n".join(body).strip()
+            title = line[3:].strip()
+            body = []
+        elif title is not None:
+            body.append(line)
+    
+    if title is not None:
+        yield title, "\n".join(body).strip()
 
 
 class Scratchpad:
@@ -14,9 +64,16 @@ class Scratchpad:
     def __init__(self):
         """Initialize an empty scratchpad."""
         self.actions = []
-        self.findings = []
         self.context = {}
         self.start_time = datetime.datetime.now()
+        # Findings are stored column-wise, with the importance ranks in a
+        # compact byte array for filtering
+        self._findings: Dict[str, List[Any]] = {field: [] for field in _FINDING_FIELDS}
+        self._finding_ranks = array("B")
+        # Titles of high and critical findings, kept up to date by log_finding
+        self._high_importance_titles: List[str] = []
+        self._summary_cache: Dict[str, Any] = {}
+        self._summary_dirty = True
     
     def log_action(self, action_type: str, description: str, details: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -27,14 +84,14 @@ class Scratchpad:
             description: Brief description of the action
             details: Additional details or parameters of the action
         """
-        timestamp = datetime.datetime.now()
         action = {
-            "timestamp": timestamp.isoformat(),
+            "timestamp": datetime.datetime.now(),
             "type": action_type,
             "description": description,
             "details": details or {}
         }
         self.actions.append(action)
+        self._summary_dirty = True
     
     def log_finding(
         self, 
@@ -54,16 +111,63 @@ class Scratchpad:
             related_actions: Indices of related actions
             evidence: Supporting evidence for the finding
         """
-        timestamp = datetime.datetime.now()
-        finding = {
-            "timestamp": timestamp.isoformat(),
+        self._append_finding({
+            "timestamp": datetime.datetime.now(),
             "title": title,
             "description": description,
             "importance": importance,
             "related_actions": related_actions or [],
             "evidence": evidence or {}
-        }
-        self.findings.append(finding)
+        })
+    
+    def _append_finding(self, finding: Dict[str, Any]) -> None:
+        """Append a finding dict to the column store."""
+        for field in _FINDING_FIELDS:
+            self._findings[field].append(finding.get(field))
+        
+        rank = _rank(finding["importance"])
+        self._finding_ranks.append(rank)
+        if rank >= _IMP["high"]:
+            self._high_importance_titles.append(finding["title"])
+        self._summary_dirty = True
+    
+    def _finding(self, index: int) -> Dict[str, Any]:
+        """Build the dict of the finding at an index of the column store."""
+        return {field: self._findings[field][index] for field in _FINDING_FIELDS}
+    
+    @property
+    def findings(self) -> List[Dict[str, Any]]:
+        """All findings as a list of dicts built from the column store, in logging order."""
+        return [self._finding(i) for i in range(len(self._finding_ranks))]
+    
+    def log_markdown_findings(self, text: str, importance: str = "high") -> int:
+        """
+        Log the finding-like sections of a markdown document.
+        
+        Sections whose "## " heading starts with finding, anomaly, cause or
+        result are logged as findings; headings that mention "critical" are
+        logged as critical.
+        
+        Args:
+            text: Markdown text to scan
+            importance: Importance level for the logged findings
+            
+        Returns:
+            Number of findings logged
+        """
+        count = 0
+        for title, description in _iter_sections(text):
+            lowered = title.lower()
+            if not lowered.startswith(FINDING_KEYWORDS):
+                continue
+            
+            self.log_finding(
+                title=title,
+                description=description,
+                importance="critical" if "critical" in lowered else importance
+            )
+            count += 1
+        return count
     
     def add_context(self, key: str, value: Any) -> None:
         """
@@ -74,6 +178,7 @@ class Scratchpad:
             value: Context value
         """
         self.context[key] = value
+        self._summary_dirty = True
     
     def get_action_history(self) -> List[Dict[str, Any]]:
         """Get the full action history."""
@@ -89,19 +194,8 @@ class Scratchpad:
         Returns:
             List of findings meeting the importance threshold
         """
-        importance_levels = {
-            "low": 0,
-            "medium": 1,
-            "high": 2,
-            "critical": 3
-        }
-        
-        min_level = importance_levels.get(min_importance.lower(), 0)
-        
-        return [
-            finding for finding in self.findings
-            if importance_levels.get(finding["importance"].lower(), 0) >= min_level
-        ]
+        min_rank = _rank(min_importance)
+        return [self._finding(i) for i, rank in enumerate(self._finding_ranks) if rank >= min_rank]
     
     def get_context(self, key: Optional[str] = None) -> Any:
         """
@@ -124,20 +218,28 @@ class Scratchpad:
         Returns:
             Dictionary with summary information
         """
+        # Everything but the timing only changes when something is logged
+        if self._summary_dirty:
+            self._summary_cache = {
+                "action_count": len(self.actions),
+                "finding_count": len(self._finding_ranks),
+                "context_keys": list(self.context.keys()),
+                "high_importance_findings": list(self._high_importance_titles)
+            }
+            self._summary_dirty = False
+        
         end_time = datetime.datetime.now()
         duration = (end_time - self.start_time).total_seconds()
         
+        cached = self._summary_cache
         return {
             "start_time": self.start_time.isoformat(),
             "end_time": end_time.isoformat(),
             "duration_seconds": duration,
-            "action_count": len(self.actions),
-            "finding_count": len(self.findings),
-            "context_keys": list(self.context.keys()),
-            "high_importance_findings": [
-                f["title"] for f in self.findings 
-                if f["importance"].lower() in ("high", "critical")
-            ]
+            "action_count": cached["action_count"],
+            "finding_count": cached["finding_count"],
+            "context_keys": list(cached["context_keys"]),
+            "high_importance_findings": list(cached["high_importance_findings"])
         }
     
     def print_report(self) -> None:
@@ -154,10 +256,14 @@ class Scratchpad:
         print(f"Actions taken: {summary['action_count']}")
         print(f"Findings: {summary['finding_count']}")
         
-        # Key findings section
+        # Key findings section, grouped by rank in a single pass
         print(f"\n## KEY FINDINGS")
-        critical_findings = [f for f in self.findings if f["importance"].lower() == "critical"]
-        high_findings = [f for f in self.findings if f["importance"].lower() == "high"]
+        buckets: List[List[Dict[str, Any]]] = [[] for _ in _IMP]
+        for index, rank in enumerate(self._finding_ranks):
+            buckets[rank].append(self._finding(index))
+        critical_findings = buckets[_IMP["critical"]]
+        high_findings = buckets[_IMP["high"]]
+        medium_findings = buckets[_IMP["medium"]]
         
         if critical_findings:
             print("\n### CRITICAL FINDINGS")
@@ -175,7 +281,6 @@ class Scratchpad:
             print("\nNo high or critical findings identified.")
         
         # Medium findings
-        medium_findings = [f for f in self.findings if f["importance"].lower() == "medium"]
         if medium_findings:
             print("\n### OTHER FINDINGS")
             for i, finding in enumerate(medium_findings):
@@ -184,7 +289,7 @@ class Scratchpad:
         # Action log summary
         print(f"\n## ACTION LOG")
         for i, action in enumerate(self.actions):
-            action_time = datetime.datetime.fromisoformat(action["timestamp"]).strftime("%H:%M:%S")
+            action_time = action["timestamp"].strftime("%H:%M:%S")
             print(f"{i+1}. [{action_time}] {action['type']}: {action['description']}")
         
         print("\n" + "="*60)
@@ -198,7 +303,7 @@ class Scratchpad:
         """
         return {
             "actions": self.actions,
-            "findings": self.findings,
+            "findings": [self._finding(i) for i in range(len(self._finding_ranks))],
             "context": self.context,
             "start_time": self.start_time.isoformat(),
             "summary": self.get_summary()
@@ -214,18 +319,80 @@ class Scratchpad:
         Returns:
             JSON string representation of the scratchpad
         """
-        indent = 2 if pretty else None
-        return json.dumps(self.to_dict(), indent=indent, default=str)
+        option = _JSON_OPTIONS | orjson.OPT_INDENT_2 if pretty else _JSON_OPTIONS
+        return orjson.dumps(self.to_dict(), option=option, default=str).decode()
+    
+    def to_json_stream(self, fp: BinaryIO) -> None:
+        """
+        Write the scratchpad as compact JSON to a binary file object.
+        
+        Writes the same keys as to_json(pretty=False), but entries are
+        serialized one at a time into a fixed-size buffer that is flushed to
+        fp whenever it fills, so the whole document never exists in memory.
+        The summary is written last, so its end time and duration are taken
+        after the actions and findings have been written.
+        
+        Args:
+            fp: Binary file object to write to
+        """
+        buffer = bytearray()
+        
+        def write(chunk: bytes) -> None:
+            buffer.extend(chunk)
+            if len(buffer) >= _WRITE_BUFFER_SIZE:
+                fp.write(buffer)
+                buffer.clear()
+        
+        def dumps(value: Any) -> bytes:
+            return orjson.dumps(value, option=_JSON_OPTIONS, default=str)
+        
+        write(b'{"actions":[')
+        for i, action in enumerate(self.actions):
+            write(b"," + dumps(action) if i else dumps(action))
+        
+        write(b'],"findings":[')
+        for i in range(len(self._finding_ranks)):
+            finding = dumps(self._finding(i))
+            write(b"," + finding if i else finding)
+        
+        write(b'],"context":' + dumps(self.context))
+        write(b',"start_time":' + dumps(self.start_time.isoformat()))
+        write(b',"summary":' + dumps(self.get_summary()) + b"}")
+        fp.write(buffer)
     
     def save_to_file(self, filename: str) -> None:
         """
-        Save scratchpad contents to a JSON file.
+        Save scratchpad contents to a compact JSON file.
+        
+        The file is streamed with to_json_stream, which does its own
+        buffering, so large scratchpads aren't built up in memory first.
         
         Args:
             filename: Path to the output file
         """
-        with open(filename, "w") as f:
-            f.write(self.to_json())
+        with open(filename, "wb") as f:
+            self.to_json_stream(f)
+    
+    def save_to_jsonl(self, filename: str) -> None:
+        """
+        Save the actions and findings to a JSON Lines file, one entry per line.
+        
+        Each line carries a "record" key ("action" or "finding"). Entries are
+        serialized one at a time, so memory use doesn't grow with the log.
+        
+        Args:
+            filename: Path to the output file
+        """
+        option = _JSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+        with open(filename, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            for action in self.actions:
+                f.write(orjson.dumps({"record": "action", **action}, option=option, default=str))
+            
+            # Build each finding line straight from the column store
+            for values in zip(*(self._findings[field] for field in _FINDING_FIELDS)):
+                line = {"record": "finding"}
+                line.update(zip(_FINDING_FIELDS, values))
+                f.write(orjson.dumps(line, option=option, default=str))
             
     @classmethod
     def from_json(cls, json_str: str) -> 'Scratchpad':
@@ -238,13 +405,17 @@ class Scratchpad:
         Returns:
             Scratchpad instance
         """
-        data = json.loads(json_str)
+        data = orjson.loads(json_str)
         scratchpad = cls()
         
         # Restore data
         scratchpad.actions = data.get("actions", [])
-        scratchpad.findings = data.get("findings", [])
         scratchpad.context = data.get("context", {})
+        for action in scratchpad.actions:
+            action["timestamp"] = datetime.datetime.fromisoformat(action["timestamp"])
+        for finding in data.get("findings", []):
+            finding["timestamp"] = datetime.datetime.fromisoformat(finding["timestamp"])
+            scratchpad._append_finding(finding)
         
         # Restore start time
         start_time_str = data.get("start_time")
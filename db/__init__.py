@@ -0,0 +1 @@
+"""Database connection helpers and seed data for SalesIQ."""
@@ -1,5 +1,7 @@
 """Database connection helper for PostgreSQL."""
+import io
 import os
+from psycopg2.extras import execute_values as _execute_values
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -18,23 +20,52 @@ DB_PORT = os.getenv("DB_PORT", "5432")
 # Create database URL
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Connection pool shared by the tools and the seed script: persistent
+# connections, plus overflow connections opened under load
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "15"))
+
+
+# Process-wide engine, created on first use
+_ENGINE = None
+
 
 def get_engine():
-    """Create and return a SQLAlchemy engine using environment variables."""
-    return create_engine(DATABASE_URL)
+    """Return the shared SQLAlchemy engine, creating it on first use."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = create_engine(
+            DATABASE_URL,
+            pool_pre_ping=True,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_POOL_MAX_OVERFLOW
+        )
+    return _ENGINE
 
 
 def get_session():
-    """Create and return a new SQLAlchemy session."""
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
+    """Create and return a new SQLAlchemy session bound to the shared engine."""
+    Session = sessionmaker(bind=get_engine())
     return Session()
 
 
 Base = declarative_base()
 
 
-def execute_query(query, params=None, fetch=True):
+def _exec_driver_sql(conn, query, params=None):
+    """
+    Run a raw statement on a connection.
+    
+    Without parameters the statement is sent as-is: SQLAlchemy would
+    otherwise pass an empty dict, and psycopg2 would then read every "%"
+    (e.g. in LIKE '%foo%') as a placeholder.
+    """
+    if params:
+        return conn.exec_driver_sql(query, params)
+    return conn.exec_driver_sql(query, execution_options={"no_parameters": True})
+
+
+def execute_query(query, params=None, fetch=True, conn=None):
     """
     Execute a raw SQL query and return results.
     
@@ -42,28 +73,168 @@ def execute_query(query, params=None, fetch=True):
         query (str): SQL query to execute
         params (dict, optional): Parameters for the query
         fetch (bool, optional): Whether to fetch results
+        conn (Connection, optional): Connection to run on; when omitted the
+            query runs in its own transaction on a pooled connection
         
     Returns:
         list: Query results if fetch is True, otherwise None
     """
-    engine = get_engine()
-    with engine.connect() as connection:
-        if params:
-            result = connection.execute(query, params)
-        else:
-            result = connection.execute(query)
-            
-        if fetch:
-            return result.fetchall()
-        return None
+    if conn is None:
+        with get_engine().begin() as conn:
+            return execute_query(query, params, fetch, conn)
+    
+    result = _exec_driver_sql(conn, query, params)
+        
+    if fetch:
+        return result.fetchall()
+    return None
+
+
+def execute_query_with_description(query, params=None, conn=None):
+    """
+    Execute a raw SQL query and return its rows together with the cursor description.
+    
+    Args:
+        query (str): SQL query to execute
+        params (dict, optional): Parameters for the query
+        conn (Connection, optional): Connection to run on
+        
+    Returns:
+        tuple: (rows, description), where each description entry has the
+            column's name and type_code (its type OID); both are empty if
+            the statement returns no rows
+    """
+    if conn is None:
+        with get_engine().begin() as conn:
+            return execute_query_with_description(query, params, conn)
+    
+    result = _exec_driver_sql(conn, query, params)
+    
+    if not result.returns_rows:
+        return [], []
+    # Read the description before fetching closes the cursor
+    description = list(result.cursor.description)
+    return result.fetchall(), description
+
+
+def execute_query_stream(query, params=None, itersize=2000, name="stream_cursor", conn=None):
+    """
+    Execute a raw SQL query and yield its rows through a server-side cursor.
+    
+    Rows are fetched `itersize` at a time, so large results are processed
+    while they arrive instead of being held in memory all at once.
+    
+    Args:
+        query (str): SQL query to execute
+        params (dict, optional): Parameters for the query
+        itersize (int, optional): Number of rows fetched per round trip
+        name (str, optional): Name of the server-side cursor
+        conn (Connection, optional): Connection to run on; when omitted the
+            query runs in its own transaction, held until the rows are consumed
+        
+    Yields:
+        tuple: Result rows
+    """
+    if conn is None:
+        with get_engine().begin() as conn:
+            yield from execute_query_stream(query, params, itersize, name, conn)
+        return
+    
+    # Naming the psycopg2 cursor makes it a server-side cursor
+    with conn.connection.cursor(name=name) as cursor:
+        cursor.itersize = itersize
+        cursor.execute(query, params)
+        yield from cursor
+
+
+def execute(query, params=None, conn=None):
+    """
+    Execute a raw SQL statement without fetching results.
+    
+    Args:
+        query (str): SQL statement to execute
+        params (dict, optional): Parameters for the statement
+        conn (Connection, optional): Connection to run on
+    """
+    execute_query(query, params, fetch=False, conn=conn)
+
+
+def execute_many(query, params_seq, conn=None):
+    """
+    Execute a raw SQL statement once per parameter set in a single transaction.
+    
+    Args:
+        query (str): SQL statement to execute
+        params_seq (iterable): Parameter sets for the statement
+        conn (Connection, optional): Connection to run on
+    """
+    params_seq = list(params_seq)
+    # An empty list would otherwise run the statement once without parameters
+    if not params_seq:
+        return
+    
+    if conn is None:
+        with get_engine().begin() as conn:
+            return execute_many(query, params_seq, conn)
+    
+    conn.exec_driver_sql(query, params_seq)
+
+
+def execute_values(query, rows, template=None, page_size=1000, fetch=False, conn=None):
+    """
+    Insert many rows with multi-row VALUES lists in a single transaction.
+    
+    Args:
+        query (str): INSERT statement with a single "VALUES %s" placeholder
+        rows (sequence): Row tuples, or dicts when a named template is given
+        template (str, optional): Row template, e.g. "(%(a)s, %(b)s)"
+        page_size (int, optional): Number of rows sent per statement
+        fetch (bool, optional): Whether to return the RETURNING rows
+        conn (Connection, optional): Connection to run on
+        
+    Returns:
+        list: RETURNING rows in insertion order if fetch is True, otherwise None
+    """
+    if conn is None:
+        with get_engine().begin() as conn:
+            return execute_values(query, rows, template, page_size, fetch, conn)
+    
+    # execute_values needs the underlying psycopg2 cursor
+    with conn.connection.cursor() as cursor:
+        result = _execute_values(
+            cursor, query, rows, template=template, page_size=page_size, fetch=fetch
+        )
+    
+    return result if fetch else None
+
+
+def copy_dataframe(df, table, conn=None):
+    """
+    Bulk-load a DataFrame into a table with COPY ... FROM STDIN.
+    
+    Args:
+        df (DataFrame): Rows to load; column names must match the table's
+        table (str): Target table name
+        conn (Connection, optional): Connection to run on
+    """
+    if conn is None:
+        with get_engine().begin() as conn:
+            return copy_dataframe(df, table, conn)
+    
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    
+    columns = ", ".join(df.columns)
+    with conn.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
 
 
 def test_connection():
     """Test the database connection and return status."""
     try:
-        engine = get_engine()
-        with engine.connect() as connection:
-            result = connection.execute("SELECT 1")
+        with get_engine().connect() as connection:
+            connection.exec_driver_sql("SELECT 1")
             return True
     except Exception as e:
         print(f"Database connection error: {e}")
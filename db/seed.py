@@ -3,18 +3,19 @@ Seed script to populate the database with mock sales and marketing data.
 This creates realistic campaign data with anomalies for the agent to investigate.
 """
 import os
-import sys
 import random
 import datetime
+import functools
 from datetime import timedelta
+import numpy as np
 import pandas as pd
+from numba import njit, prange
 from dotenv import load_dotenv
 from tqdm import tqdm
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from db.connection import execute_query, test_connection
+from db.connection import copy_dataframe, execute, execute_query, execute_values, get_engine, test_connection
 
 # Load environment variables
 load_dotenv()
@@ -29,25 +30,43 @@ PLATFORMS = ["facebook", "google", "instagram", "twitter", "linkedin"]
 LOCATIONS = ["US", "UK", "CA", "AU", "DE", "FR", "JP", "BR", "IN", "MX"]
 AD_TYPES = ["banner", "video", "text", "carousel", "native"]
 CONVERSION_TYPES = ["purchase", "signup", "download", "lead", "pageview"]
+CAMPAIGN_STATUSES = ["active", "paused", "completed"]
+TARGET_AUDIENCES = ["male", "female", "young adults", "seniors", "professionals"]
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Array versions of the choice lists, for vectorized sampling
+DEVICES_ARR = np.array(DEVICES)
+PLATFORMS_ARR = np.array(PLATFORMS)
+LOCATIONS_ARR = np.array(LOCATIONS)
+CONVERSION_TYPES_ARR = np.array(CONVERSION_TYPES)
 
 # Anomaly settings - Campaign 5 will have a CTR drop after day 20
 ANOMALY_CAMPAIGN = 5
 ANOMALY_START_DAY = 20
 CTR_DROP_FACTOR = 0.5  # 50% drop
 
+# Worker threads (and connections) used to load raw events
+SEED_WORKERS = int(os.getenv("SEED_WORKERS", "4"))
+
+# Every day of generated data, oldest first; the last one is today
+BASE_DATE = datetime.date.today() - timedelta(days=DAYS_OF_DATA)
+DATES = [BASE_DATE + timedelta(days=day) for day in range(DAYS_OF_DATA + 1)]
+
+
+@functools.lru_cache(maxsize=1)
+def _schema_sql():
+    """Read schema.sql once per process."""
+    with open(os.path.join(os.path.dirname(__file__), "schema.sql"), "r") as f:
+        return f.read()
+
 
 def create_tables():
     """Create tables if they don't exist."""
     print("Creating tables...")
     
-    # Read schema.sql file
-    with open(os.path.join(os.path.dirname(__file__), "schema.sql"), "r") as f:
-        schema_sql = f.read()
-    
-    # Execute each statement
-    for statement in schema_sql.split(";"):
-        if statement.strip():
-            execute_query(statement, fetch=False)
+    # Send the whole script at once; the statements are idempotent
+    with get_engine().begin() as conn:
+        conn.exec_driver_sql(_schema_sql())
     
     print("Tables created successfully.")
 
@@ -65,8 +84,9 @@ def clear_existing_data():
         "campaigns"
     ]
     
-    for table in tables:
-        execute_query(f"DELETE FROM {table}", fetch=False)
+    with get_engine().begin() as conn:
+        for table in tables:
+            execute(f"DELETE FROM {table}", conn=conn)
     
     print("Data cleared successfully.")
 
@@ -76,30 +96,35 @@ def seed_campaigns():
     print("Seeding campaigns...")
     
     campaigns = []
-    today = datetime.date.today()
+    today = DATES[-1]
     
-    for i in range(1, CAMPAIGN_COUNT + 1):
-        start_date = today - timedelta(days=DAYS_OF_DATA)
+    # Draw the categorical fields for all campaigns at once
+    statuses = random.choices(CAMPAIGN_STATUSES, k=CAMPAIGN_COUNT)
+    audiences = random.choices(TARGET_AUDIENCES, k=CAMPAIGN_COUNT)
+    
+    for i, status, audience in zip(range(1, CAMPAIGN_COUNT + 1), statuses, audiences):
         end_date = today + timedelta(days=random.randint(10, 30))
         
         campaign = {
             "name": f"Campaign {i}",
             "description": f"Test campaign {i} for sales analytics",
-            "start_date": start_date,
+            "start_date": BASE_DATE,
             "end_date": end_date,
             "budget": random.uniform(5000, 50000),
-            "status": random.choice(["active", "paused", "completed"]),
-            "target_audience": random.choice(["male", "female", "young adults", "seniors", "professionals"])
+            "status": status,
+            "target_audience": audience
         }
         campaigns.append(campaign)
-        
-        query = """
-        INSERT INTO campaigns (name, description, start_date, end_date, budget, status, target_audience)
-        VALUES (%(name)s, %(description)s, %(start_date)s, %(end_date)s, %(budget)s, %(status)s, %(target_audience)s)
-        RETURNING campaign_id
-        """
-        result = execute_query(query, campaign)
-        campaign["campaign_id"] = result[0][0]
+    
+    query = """
+    INSERT INTO campaigns (name, description, start_date, end_date, budget, status, target_audience)
+    VALUES %s
+    RETURNING campaign_id
+    """
+    template = "(%(name)s, %(description)s, %(start_date)s, %(end_date)s, %(budget)s, %(status)s, %(target_audience)s)"
+    result = execute_values(query, campaigns, template=template, fetch=True)
+    for campaign, row in zip(campaigns, result):
+        campaign["campaign_id"] = row[0]
     
     return campaigns
 
@@ -109,6 +134,7 @@ def seed_ads(campaigns):
     print("Seeding ads...")
     
     ads = []
+    ad_types = iter(random.choices(AD_TYPES, k=len(campaigns) * ADS_PER_CAMPAIGN))
     for campaign in campaigns:
         for i in range(1, ADS_PER_CAMPAIGN + 1):
             ad = {
@@ -116,205 +142,271 @@ def seed_ads(campaigns):
                 "name": f"Ad {i} for {campaign['name']}",
                 "description": f"Test ad {i} for {campaign['name']}",
                 "creative_url": f"https://example.com/creatives/{campaign['campaign_id']}/ad{i}.jpg",
-                "ad_type": random.choice(AD_TYPES)
+                "ad_type": next(ad_types)
             }
             ads.append(ad)
-            
-            query = """
-            INSERT INTO ads (campaign_id, name, description, creative_url, ad_type)
-            VALUES (%(campaign_id)s, %(name)s, %(description)s, %(creative_url)s, %(ad_type)s)
-            RETURNING ad_id
-            """
-            result = execute_query(query, ad)
-            ad["ad_id"] = result[0][0]
+    
+    query = """
+    INSERT INTO ads (campaign_id, name, description, creative_url, ad_type)
+    VALUES %s
+    RETURNING ad_id
+    """
+    template = "(%(campaign_id)s, %(name)s, %(description)s, %(creative_url)s, %(ad_type)s)"
+    result = execute_values(query, ads, template=template, fetch=True)
+    for ad, row in zip(ads, result):
+        ad["ad_id"] = row[0]
     
     return ads
 
 
 def generate_performance_data(campaigns, ads):
-    """Generate performance data including impressions, clicks, and conversions."""
+    """
+    Generate performance data including impressions, clicks, and conversions.
+    
+    Every metric is drawn for all days and ads at once as a (days, ads) matrix;
+    the result is a DataFrame with one row per day and ad, ordered by day.
+    """
     print("Generating performance data...")
     
-    base_date = datetime.date.today() - timedelta(days=DAYS_OF_DATA)
-    all_metrics = []
+    rng = np.random.default_rng()
+    shape = (len(DATES), len(ads))
     
-    for day in tqdm(range(DAYS_OF_DATA + 1)):
-        current_date = base_date + timedelta(days=day)
-        
-        for campaign in campaigns:
-            campaign_id = campaign["campaign_id"]
-            campaign_ads = [ad for ad in ads if ad["campaign_id"] == campaign_id]
+    ad_ids = np.array([ad["ad_id"] for ad in ads])
+    campaign_ids = np.array([ad["campaign_id"] for ad in ads])
+    
+    # Base metrics with some randomness
+    impressions = rng.integers(500, 2001, size=shape)
+    
+    # Normal CTR range (1-5%)
+    base_ctr = rng.uniform(0.01, 0.05, shape)
+    
+    # Conversion rate range (1-10% of clicks)
+    base_cvr = rng.uniform(0.01, 0.1, shape)
+    
+    # Apply anomaly to Campaign 5 after day 20
+    base_ctr[ANOMALY_START_DAY:, campaign_ids == ANOMALY_CAMPAIGN] *= CTR_DROP_FACTOR
+    
+    spend = rng.uniform(50, 200, shape)
+    conversion_value = rng.uniform(20, 100, shape)
+    
+    # Calculate derived and performance metrics
+    clicks, conversions, ctr, cpc, cvr, roas = _derive_metrics(
+        impressions, base_ctr, base_cvr, spend, conversion_value
+    )
+    
+    return pd.DataFrame({
+        "date": np.repeat(np.array(DATES, dtype=object), len(ads)),
+        "campaign_id": np.tile(campaign_ids, len(DATES)),
+        "ad_id": np.tile(ad_ids, len(DATES)),
+        "impressions": impressions.ravel(),
+        "clicks": clicks.ravel(),
+        "conversions": conversions.ravel(),
+        "spend": spend.ravel(),
+        "ctr": ctr.ravel(),
+        "cpc": cpc.ravel(),
+        "cvr": cvr.ravel(),
+        "roas": roas.ravel(),
+    })
+
+
+@njit(cache=True, parallel=True)
+def _derive_metrics(impressions, base_ctr, base_cvr, spend, conversion_value):
+    """
+    Compute clicks, conversions and the ratio metrics from the base samples.
+    
+    All arguments are (days, ads) arrays; days are processed in parallel.
+    Counts are capped like before, and ratios over zero are 0.
+    
+    Returns:
+        tuple: clicks, conversions, ctr, cpc, cvr and roas arrays
+    """
+    days, n_ads = impressions.shape
+    clicks = np.empty((days, n_ads), dtype=np.int64)
+    conversions = np.empty((days, n_ads), dtype=np.int64)
+    ctr = np.empty((days, n_ads))
+    cpc = np.empty((days, n_ads))
+    cvr = np.empty((days, n_ads))
+    roas = np.empty((days, n_ads))
+    
+    for day in prange(days):
+        for ad in range(n_ads):
+            day_impressions = impressions[day, ad]
+            day_clicks = min(int(day_impressions * base_ctr[day, ad]), day_impressions)
+            day_conversions = min(int(day_clicks * base_cvr[day, ad]), day_clicks)
+            day_spend = spend[day, ad]
             
-            for ad in campaign_ads:
-                ad_id = ad["ad_id"]
-                
-                # Base metrics with some randomness
-                base_impressions = random.randint(500, 2000)
-                
-                # Normal CTR range (1-5%)
-                base_ctr = random.uniform(0.01, 0.05)
-                
-                # Conversion rate range (1-10% of clicks)
-                base_cvr = random.uniform(0.01, 0.1)
-                
-                # Apply anomaly to Campaign 5 after day 20
-                if campaign_id == ANOMALY_CAMPAIGN and day >= ANOMALY_START_DAY:
-                    base_ctr *= CTR_DROP_FACTOR
-                
-                # Calculate derived metrics
-                impressions = base_impressions
-                clicks = int(impressions * base_ctr)
-                conversions = int(clicks * base_cvr)
-                spend = random.uniform(50, 200)
-                
-                # Safety checks
-                clicks = min(clicks, impressions)
-                conversions = min(conversions, clicks)
-                
-                # Calculate performance metrics
-                ctr = clicks / impressions if impressions > 0 else 0
-                cpc = spend / clicks if clicks > 0 else 0
-                cvr = conversions / clicks if clicks > 0 else 0
-                roas = (conversions * random.uniform(20, 100)) / spend if spend > 0 else 0
-                
-                # Create daily metric record
-                metric = {
-                    "date": current_date,
-                    "campaign_id": campaign_id,
-                    "ad_id": ad_id,
-                    "impressions": impressions,
-                    "clicks": clicks,
-                    "conversions": conversions,
-                    "spend": spend,
-                    "ctr": ctr,
-                    "cpc": cpc,
-                    "cvr": cvr,
-                    "roas": roas
-                }
-                all_metrics.append(metric)
-    
-    return all_metrics
+            clicks[day, ad] = day_clicks
+            conversions[day, ad] = day_conversions
+            ctr[day, ad] = day_clicks / day_impressions if day_impressions > 0 else 0.0
+            cpc[day, ad] = day_spend / day_clicks if day_clicks > 0 else 0.0
+            cvr[day, ad] = day_conversions / day_clicks if day_clicks > 0 else 0.0
+            roas[day, ad] = (
+                day_conversions * conversion_value[day, ad] / day_spend if day_spend > 0 else 0.0
+            )
+    
+    return clicks, conversions, ctr, cpc, cvr, roas
 
 
 def seed_daily_metrics(metrics):
     """Save the daily metrics to the database."""
     print("Saving daily metrics...")
-    
-    for metric in tqdm(metrics):
-        query = """
-        INSERT INTO daily_metrics 
-        (date, campaign_id, ad_id, impressions, clicks, conversions, spend, ctr, cpc, cvr, roas)
-        VALUES 
-        (%(date)s, %(campaign_id)s, %(ad_id)s, %(impressions)s, %(clicks)s, %(conversions)s, 
-         %(spend)s, %(ctr)s, %(cpc)s, %(cvr)s, %(roas)s)
-        """
-        execute_query(query, metric, fetch=False)
+    copy_dataframe(metrics, "daily_metrics")
 
 
 def generate_raw_events(metrics):
     """
     Generate individual impression, click, and conversion events
     based on the aggregated metrics.
+    
+    Each (day, campaign) chunk is sampled and loaded by a worker thread on its
+    own connection, so chunks are written concurrently.
     """
     print("Generating raw events...")
     
-    for metric in tqdm(metrics):
-        date = metric["date"]
-        campaign_id = metric["campaign_id"]
-        ad_id = metric["ad_id"]
+    chunks = list(metrics.groupby(["date", "campaign_id"], sort=False))
+    
+    # Independent random streams, since a Generator isn't thread-safe
+    seeds = np.random.SeedSequence().spawn(len(chunks))
+    
+    with ThreadPoolExecutor(max_workers=SEED_WORKERS) as executor:
+        futures = [
+            executor.submit(_load_events, date, chunk_metrics, seed)
+            for ((date, _), chunk_metrics), seed in zip(chunks, seeds)
+        ]
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            future.result()
+
+
+def _load_events(date, chunk_metrics, seed):
+    """
+    Sample and load the events of one chunk of metric rows in one transaction.
+    
+    The events are loaded with COPY. Only impressions that lead to a click
+    and clicks that lead to a conversion need their id up front; those ids
+    are reserved from the tables' sequences, and every other event takes the
+    column default.
+    """
+    rng = np.random.default_rng(seed)
+    impressions, clicks, conversions = _sample_events(date, chunk_metrics, rng)
+    
+    impression_rows = clicks.pop("impression_row").to_numpy()
+    click_rows = conversions.pop("click_row").to_numpy()
+    
+    with get_engine().begin() as conn:
+        impression_ids = _reserve_ids("impressions", "impression_id", len(impression_rows), conn)
+        clicks.insert(0, "impression_id", impression_ids)
         
-        # Generate impression events
-        for i in range(metric["impressions"]):
-            timestamp = datetime.datetime.combine(
-                date, 
-                datetime.time(
-                    hour=random.randint(0, 23),
-                    minute=random.randint(0, 59),
-                    second=random.randint(0, 59)
-                )
-            )
-            
-            user_id = f"user_{random.randint(1, USER_POOL_SIZE)}"
-            platform = random.choice(PLATFORMS)
-            device = random.choice(DEVICES)
-            location = random.choice(LOCATIONS)
-            
-            impression = {
-                "ad_id": ad_id,
-                "campaign_id": campaign_id,
-                "user_id": user_id,
-                "timestamp": timestamp,
-                "platform": platform,
-                "device": device,
-                "location": location
-            }
-            
-            query = """
-            INSERT INTO impressions 
-            (ad_id, campaign_id, user_id, timestamp, platform, device, location)
-            VALUES 
-            (%(ad_id)s, %(campaign_id)s, %(user_id)s, %(timestamp)s, %(platform)s, 
-             %(device)s, %(location)s)
-            RETURNING impression_id
-            """
-            
-            result = execute_query(query, impression)
-            impression_id = result[0][0]
-            
-            # Generate click events (based on CTR)
-            if i < metric["clicks"]:
-                # Add random delay for click (1-60 seconds)
-                click_timestamp = timestamp + timedelta(seconds=random.randint(1, 60))
-                
-                click = {
-                    "impression_id": impression_id,
-                    "ad_id": ad_id,
-                    "campaign_id": campaign_id,
-                    "user_id": user_id,
-                    "timestamp": click_timestamp,
-                    "platform": platform,
-                    "device": device,
-                    "location": location
-                }
-                
-                query = """
-                INSERT INTO clicks 
-                (impression_id, ad_id, campaign_id, user_id, timestamp, platform, device, location)
-                VALUES 
-                (%(impression_id)s, %(ad_id)s, %(campaign_id)s, %(user_id)s, %(timestamp)s, 
-                 %(platform)s, %(device)s, %(location)s)
-                RETURNING click_id
-                """
-                
-                result = execute_query(query, click)
-                click_id = result[0][0]
-                
-                # Generate conversion events (based on CVR)
-                if i < metric["conversions"]:
-                    # Add random delay for conversion (30-600 seconds)
-                    conversion_timestamp = click_timestamp + timedelta(seconds=random.randint(30, 600))
-                    conversion_type = random.choice(CONVERSION_TYPES)
-                    conversion_value = random.uniform(10, 200)
-                    
-                    conversion = {
-                        "click_id": click_id,
-                        "ad_id": ad_id,
-                        "campaign_id": campaign_id,
-                        "user_id": user_id,
-                        "conversion_type": conversion_type,
-                        "conversion_value": conversion_value,
-                        "timestamp": conversion_timestamp
-                    }
-                    
-                    query = """
-                    INSERT INTO conversions 
-                    (click_id, ad_id, campaign_id, user_id, conversion_type, conversion_value, timestamp)
-                    VALUES 
-                    (%(click_id)s, %(ad_id)s, %(campaign_id)s, %(user_id)s, %(conversion_type)s, 
-                     %(conversion_value)s, %(timestamp)s)
-                    """
-                    
-                    execute_query(query, conversion, fetch=False)
+        click_ids = _reserve_ids("clicks", "click_id", len(click_rows), conn)
+        conversions.insert(0, "click_id", click_ids)
+        
+        # Loaded in order on one connection so the foreign keys resolve
+        _copy_events(impressions, "impressions", "impression_id", impression_rows, impression_ids, conn)
+        _copy_events(clicks, "clicks", "click_id", click_rows, click_ids, conn)
+        copy_dataframe(conversions, "conversions", conn)
+
+
+def _sample_events(date, chunk_metrics, rng):
+    """
+    Sample the impression, click and conversion events of one (date, campaign) chunk.
+    
+    `chunk_metrics` holds the daily metric rows of the chunk's ads on `date`.
+    
+    Clicks come from the first impressions of each metric row and conversions
+    from the first clicks; the `impression_row` and `click_row` columns hold
+    the position of the parent event in the previous frame.
+    
+    Returns:
+        tuple: (impressions, clicks, conversions) DataFrames
+    """
+    impression_counts = chunk_metrics["impressions"].to_numpy()
+    click_counts = chunk_metrics["clicks"].to_numpy()
+    conversion_counts = chunk_metrics["conversions"].to_numpy()
+    n_impressions = impression_counts.sum()
+    
+    # Generate impression events at random times of the day
+    timestamps = np.datetime64(date, "s") + _seconds(rng, 0, SECONDS_PER_DAY - 1, n_impressions)
+    user_ids = np.char.add("user_", rng.integers(1, USER_POOL_SIZE + 1, n_impressions).astype(str))
+    platforms = PLATFORMS_ARR[rng.integers(0, len(PLATFORMS_ARR), n_impressions)]
+    devices = DEVICES_ARR[rng.integers(0, len(DEVICES_ARR), n_impressions)]
+    locations = LOCATIONS_ARR[rng.integers(0, len(LOCATIONS_ARR), n_impressions)]
+    impressions = pd.DataFrame({
+        "ad_id": np.repeat(chunk_metrics["ad_id"].to_numpy(), impression_counts),
+        "campaign_id": np.repeat(chunk_metrics["campaign_id"].to_numpy(), impression_counts),
+        "user_id": user_ids,
+        "timestamp": timestamps,
+        "platform": platforms,
+        "device": devices,
+        "location": locations,
+    })
+    
+    # Generate click events (based on CTR) for the first impressions,
+    # with a random delay of 1-60 seconds
+    impression_rows = _leading_rows(impression_counts, click_counts)
+    clicks = impressions.iloc[impression_rows].reset_index(drop=True)
+    clicks["timestamp"] += _seconds(rng, 1, 60, len(clicks))
+    clicks["impression_row"] = impression_rows
+    
+    # Generate conversion events (based on CVR) for the first clicks,
+    # with a random delay of 30-600 seconds
+    click_rows = _leading_rows(click_counts, conversion_counts)
+    n_conversions = len(click_rows)
+    conversions = pd.DataFrame({
+        "ad_id": clicks["ad_id"].to_numpy()[click_rows],
+        "campaign_id": clicks["campaign_id"].to_numpy()[click_rows],
+        "user_id": clicks["user_id"].to_numpy()[click_rows],
+        "conversion_type": CONVERSION_TYPES_ARR[rng.integers(0, len(CONVERSION_TYPES_ARR), n_conversions)],
+        "conversion_value": rng.uniform(10, 200, n_conversions),
+        "timestamp": clicks["timestamp"].to_numpy()[click_rows] + _seconds(rng, 30, 600, n_conversions),
+        "click_row": click_rows,
+    })
+    
+    return impressions, clicks, conversions
+
+
+def _leading_rows(block_sizes, counts):
+    """
+    Return the positions of the first `counts[i]` rows of each consecutive block.
+    
+    Args:
+        block_sizes (ndarray): Number of rows in each block
+        counts (ndarray): Number of leading rows to take from each block
+    """
+    block_starts = np.cumsum(block_sizes) - block_sizes
+    taken_starts = np.cumsum(counts) - counts
+    return np.repeat(block_starts - taken_starts, counts) + np.arange(counts.sum())
+
+
+def _copy_events(events, table, id_column, rows, ids, conn):
+    """
+    COPY events into a table, giving the rows at `rows` the reserved `ids`.
+    
+    The remaining events are loaded without an id so they take the
+    sequence default.
+    """
+    parents = events.iloc[rows]
+    parents.insert(0, id_column, ids)
+    copy_dataframe(parents, table, conn)
+    
+    others = np.ones(len(events), dtype=bool)
+    others[rows] = False
+    copy_dataframe(events[others], table, conn)
+
+
+def _reserve_ids(table, column, count, conn):
+    """Reserve `count` ids from the sequence behind a serial column."""
+    if not count:
+        return np.empty(0, dtype=np.int64)
+    rows = execute_query(
+        "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+        (table, column, int(count)),
+        conn=conn
+    )
+    return np.array([row[0] for row in rows], dtype=np.int64)
+
+
+def _seconds(rng, low, high, size):
+    """Draw `size` random durations between `low` and `high` seconds, inclusive."""
+    return rng.integers(low, high + 1, size).astype("timedelta64[s]")
 
 
 def main():
@@ -0,0 +1,17 @@
+"""Shared fixtures; run the tests from the repository root with python -m pytest."""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Skip the test unless the PostgreSQL database from .env is reachable."""
+    pytest.importorskip("sqlalchemy")
+    pytest.importorskip("psycopg2")
+    from db.connection import get_engine
+
+    try:
+        with get_engine().connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+    except Exception as e:
+        pytest.skip(f"database not reachable: {e}")
@@ -0,0 +1,42 @@
+"""Tests for the raw SQL helpers in db.connection."""
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("psycopg2")
+
+from db.connection import execute_query, execute_query_with_description
+
+
+class _RecordingConnection:
+    """Connection stand-in that records the exec_driver_sql calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def exec_driver_sql(self, query, *args, **kwargs):
+        self.calls.append((query, args, kwargs))
+        return None
+
+
+def test_query_without_params_is_sent_without_parameter_parsing():
+    conn = _RecordingConnection()
+    execute_query("SELECT '100%'", fetch=False, conn=conn)
+    assert conn.calls == [("SELECT '100%'", (), {"execution_options": {"no_parameters": True}})]
+
+
+def test_query_with_params_passes_them_through():
+    conn = _RecordingConnection()
+    execute_query("SELECT %(x)s", {"x": 1}, fetch=False, conn=conn)
+    assert conn.calls == [("SELECT %(x)s", ({"x": 1},), {})]
+
+
+def test_literal_percent_without_params(database):
+    rows = execute_query("SELECT '100%' AS pct, 'abc' LIKE '%b%' AS matched")
+    assert [tuple(row) for row in rows] == [("100%", True)]
+
+
+def test_literal_percent_with_description(database):
+    rows, description = execute_query_with_description("SELECT 'a%' AS value")
+    assert [tuple(row) for row in rows] == [("a%",)]
+    assert [col.name for col in description] == ["value"]
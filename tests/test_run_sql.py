@@ -0,0 +1,51 @@
+"""Tests for SQLTool."""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("psycopg2")
+pytest.importorskip("pandas")
+
+import tools.run_sql as run_sql
+from tools.run_sql import SQLTool
+
+# Queries ending the ways LLM-written SQL often does
+TRAILING_QUERIES = [
+    "SELECT 1 AS x -- trailing comment",
+    "SELECT 1 AS x;",
+    "SELECT 1 AS x\n-- trailing comment line\n",
+]
+
+
+def test_preview_wrappers_end_trailing_comments(monkeypatch):
+    queries = []
+
+    def fake_with_description(query, params=None):
+        queries.append(query)
+        return [(1,)], [SimpleNamespace(name="x", type_code=23)]
+
+    def fake_execute_query(query, params=None):
+        queries.append(query)
+        return [(1, 1, 1, 1, 1)]
+
+    monkeypatch.setattr(run_sql, "execute_query_with_description", fake_with_description)
+    monkeypatch.setattr(run_sql, "execute_query", fake_execute_query)
+
+    result = SQLTool().run_preview("SELECT 1 AS x -- note;", n=5)
+    assert result["success"], result
+    assert queries == [
+        "SELECT * FROM (SELECT 1 AS x -- note\n) _sub LIMIT 5",
+        "SELECT COUNT(*), MIN(\"x\"), MAX(\"x\"), AVG(\"x\"), "
+        "PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY \"x\") FROM (SELECT 1 AS x -- note\n) _sub",
+    ]
+
+
+@pytest.mark.parametrize("query", TRAILING_QUERIES)
+def test_run_preview_with_trailing_comment_or_semicolon(database, query):
+    result = SQLTool().run_preview(query, n=5)
+    assert result["success"], result
+    assert result["row_count"] == 1
+    assert result["data"] == [{"x": 1}]
+    assert result["statistics"]["x"]["max"] == 1.0
@@ -0,0 +1 @@
+"""Tools exposed to the SalesIQ agents."""
@@ -1,22 +1,234 @@
 """Tool for retrieving database schema information."""
 
 import os
-import sys
-from typing import Dict, List, Any, Optional, Union
+import copy
+import time
+import atexit
+import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from db.connection import execute_query, test_connection
+import orjson
+
+from db.connection import execute_query, execute_query_stream, DB_NAME
+
+# How long (in seconds) cached schema introspection results are trusted
+# before the schema version is checked again
+SCHEMA_CACHE_TTL = int(os.getenv("SCHEMA_CACHE_TTL", "300"))
+
+# File that keeps cached results across processes; empty to disable
+SCHEMA_CACHE_FILE = os.path.expanduser(
+    os.getenv("SCHEMA_CACHE_FILE", os.path.join("~", ".cache", "kpi-agent", "schema.json"))
+)
+
+# Introspection results shared by all SchemaTool instances, keyed by
+# (database, lookup, *args) and stored as (check time, schema version, value)
+_schema_cache: Dict[Tuple[str, ...], Tuple[float, str, Any]] = {}
+_disk_cache_loaded = False
+
+# Guards the cache state above and below; lookups run on the concurrent
+# crew task threads and --concurrency workers
+_cache_lock = threading.Lock()
+
+# Schema version whose entries are written to the cache file at exit, or
+# None if nothing was loaded since the file was last written
+_disk_cache_pending: Optional[str] = None
+
+# Separator of the key parts in the cache file
+_KEY_SEPARATOR = "\t"
+
+
+# Introspection reads pg_catalog directly: the information_schema views
+# project over the same catalogs with generic privilege filtering on top,
+# which makes them several times slower. Relation kinds listed as tables
+# match information_schema.tables: tables, partitioned tables, views and
+# foreign tables.
+TABLE_RELKINDS = "('r', 'p', 'v', 'f')"
+
+# Relation kind and planner row estimate of every listed table; the
+# estimate is -1 if never analyzed and meaningless for relations without
+# storage of their own (see SchemaTool._row_count)
+ROW_ESTIMATE_QUERY = f"""
+SELECT c.relname, c.relkind, c.reltuples::bigint
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = 'public' AND c.relkind IN {TABLE_RELKINDS}
+"""
+
+# Cheap fingerprint of the public schema: DDL adds, removes or rewrites
+# rows of pg_class and of the catalogs describing columns, defaults,
+# constraints and indexes (RENAME COLUMN, SET NOT NULL or ADD CONSTRAINT
+# may leave pg_class untouched), so each contributes its row count and
+# newest row version; ANALYZE updates the row estimates
+SCHEMA_VERSION_QUERY = """
+WITH rels AS (
+    SELECT c.oid, c.xmin, c.reltuples
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public'
+)
+SELECT
+    (SELECT COUNT(*) FROM rels),
+    (SELECT MAX(xmin::text::bigint) FROM rels),
+    (SELECT SUM(reltuples) FROM rels),
+    (SELECT COUNT(*) || ':' || COALESCE(MAX(a.xmin::text::bigint), 0)
+     FROM pg_attribute a WHERE a.attrelid IN (SELECT oid FROM rels)),
+    (SELECT COUNT(*) || ':' || COALESCE(MAX(ad.xmin::text::bigint), 0)
+     FROM pg_attrdef ad WHERE ad.adrelid IN (SELECT oid FROM rels)),
+    (SELECT COUNT(*) || ':' || COALESCE(MAX(con.xmin::text::bigint), 0)
+     FROM pg_constraint con WHERE con.conrelid IN (SELECT oid FROM rels)),
+    (SELECT COUNT(*) || ':' || COALESCE(MAX(x.xmin::text::bigint), 0)
+     FROM pg_index x WHERE x.indrelid IN (SELECT oid FROM rels))
+"""
+
+
+def _schema_version() -> str:
+    """Return the current fingerprint of the public schema."""
+    return "/".join(str(part) for part in execute_query(SCHEMA_VERSION_QUERY)[0])
+
+
+def _load_disk_cache(version: str, now: float) -> None:
+    """Load the cache file's entries into memory if they match the schema version."""
+    global _disk_cache_loaded
+    with _cache_lock:
+        if _disk_cache_loaded:
+            return
+        _disk_cache_loaded = True
+    if not SCHEMA_CACHE_FILE:
+        return
+    
+    try:
+        with open(SCHEMA_CACHE_FILE, "rb") as f:
+            data = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return
+    
+    if data.get("version") != version:
+        return
+    with _cache_lock:
+        for key, value in data.get("entries", {}).items():
+            _schema_cache.setdefault(tuple(key.split(_KEY_SEPARATOR)), (now, version, value))
+
+
+def _save_disk_cache() -> None:
+    """Write the in-memory entries of the pending schema version to the cache file."""
+    global _disk_cache_pending
+    if not SCHEMA_CACHE_FILE:
+        return
+    
+    # Snapshot the entries under the lock, then serialize without holding it
+    with _cache_lock:
+        version, _disk_cache_pending = _disk_cache_pending, None
+        if version is None:
+            return
+        entries = {
+            _KEY_SEPARATOR.join(key): value
+            for key, (_, entry_version, value) in _schema_cache.items()
+            if entry_version == version
+        }
+    
+    try:
+        directory = os.path.dirname(SCHEMA_CACHE_FILE)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file and rename it over the cache file, so
+        # readers and concurrent writers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps({"version": version, "entries": entries}))
+            os.replace(tmp_path, SCHEMA_CACHE_FILE)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError:
+        # The disk cache is an optimization; failing to write it is harmless
+        pass
+
+
+# Newly loaded results are written once per process rather than on every miss
+atexit.register(_save_disk_cache)
+
+
+def _cached(key: Tuple[str, ...], loader: Callable[[], Any]) -> Any:
+    """
+    Return a cached introspection result, loading it if missing or outdated.
+    
+    Results younger than SCHEMA_CACHE_TTL are returned as-is. Older or
+    missing ones are checked against the schema version, so an unchanged
+    schema costs one probe query instead of a reload.
+    
+    Args:
+        key: Cache key for the lookup
+        loader: Function that queries the database for the value
+        
+    Returns:
+        A copy of the cached or freshly loaded value, so callers can't
+        change the shared entry
+    """
+    global _disk_cache_pending
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _schema_cache.get(key)
+    if entry is not None and now - entry[0] < SCHEMA_CACHE_TTL:
+        return copy.deepcopy(entry[2])
+    
+    version = _schema_version()
+    if not _disk_cache_loaded:
+        _load_disk_cache(version, now)
+        with _cache_lock:
+            entry = _schema_cache.get(key)
+    
+    if entry is not None and entry[1] == version:
+        with _cache_lock:
+            _schema_cache[key] = (now, version, entry[2])
+        return copy.deepcopy(entry[2])
+    
+    # Query outside the lock so independent lookups don't wait on each other
+    value = loader()
+    with _cache_lock:
+        _schema_cache[key] = (now, version, value)
+        _disk_cache_pending = version
+    return copy.deepcopy(value)
+
+
+def clear_schema_cache() -> None:
+    """Drop all cached schema introspection results, including the cache file."""
+    global _disk_cache_pending
+    with _cache_lock:
+        _schema_cache.clear()
+        _disk_cache_pending = None
+    if SCHEMA_CACHE_FILE and os.path.exists(SCHEMA_CACHE_FILE):
+        os.remove(SCHEMA_CACHE_FILE)
+
+
+def _type_info(column: Dict[str, Any]) -> str:
+    """Format a column's type with its maximum length, e.g. "character varying(100)"."""
+    if column["max_length"]:
+        return f"{column['type']}({column['max_length']})"
+    return column["type"]
+
+
+def _reference(constraint: Dict[str, Any]) -> str:
+    """Format the table(column) a constraint references, or "" if none."""
+    if constraint["foreign_table"] and constraint["foreign_column"]:
+        return f"{constraint['foreign_table']}({constraint['foreign_column']})"
+    return ""
 
 
 class SchemaTool:
-    """Tool for retrieving and analyzing database schema information."""
+    """
+    Tool for retrieving and analyzing database schema information.
+    
+    Queries run on the shared connection pool, so creating a tool doesn't
+    touch the database; connection problems surface on the first lookup.
+    """
     
-    def __init__(self):
-        """Initialize the schema tool."""
-        # Test database connection
-        if not test_connection():
-            raise ConnectionError("Failed to connect to the database. Please check your connection settings.")
+    def warm_cache(self) -> None:
+        """Load the table list and relationships so the first lookups are served from cache."""
+        self.get_tables()
+        self.get_table_relationships()
     
     def get_tables(self) -> List[str]:
         """
@@ -25,41 +237,65 @@ class SchemaTool:
         Returns:
             list: List of table names
         """
-        query = """
-        SELECT table_name 
-        FROM information_schema.tables 
-        WHERE table_schema = 'public'
-        ORDER BY table_name
+        return _cached((DB_NAME, "tables"), self._load_tables)
+    
+    def _load_tables(self) -> List[str]:
+        """Query the database for the list of public tables."""
+        query = f"""
+        SELECT c.relname
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind IN {TABLE_RELKINDS}
+        ORDER BY c.relname
         """
         
         results = execute_query(query)
         return [row[0] for row in results]
     
-    def get_table_info(self, table_name: str) -> Dict[str, Any]:
+    def get_table_info(self, table_name: str, exact: bool = False) -> Dict[str, Any]:
         """
         Get detailed information about a specific table.
         
         Args:
             table_name (str): Name of the table
+            exact (bool): Whether to count the rows exactly instead of using
+                the planner's estimate; exact results aren't cached, since
+                row changes don't change the schema version
             
         Returns:
             dict: Dictionary containing table schema information
         """
+        if exact:
+            return self._load_table_info(table_name, exact=True)
+        return _cached(
+            (DB_NAME, "table_info", table_name),
+            lambda: self._load_table_info(table_name)
+        )
+    
+    def _load_table_info(self, table_name: str, exact: bool = False) -> Dict[str, Any]:
+        """Query the database for the schema information of a single table."""
         # Get column information
-        column_query = """
-        SELECT 
-            column_name, 
-            data_type, 
-            character_maximum_length,
-            column_default,
-            is_nullable
-        FROM 
-            information_schema.columns
-        WHERE 
-            table_schema = 'public' AND 
-            table_name = %s
-        ORDER BY 
-            ordinal_position
+        column_query = f"""
+        SELECT
+            a.attname,
+            format_type(a.atttypid, NULL),
+            CASE WHEN a.atttypid IN ('varchar'::regtype, 'bpchar'::regtype) AND a.atttypmod > 0
+                 THEN a.atttypmod - 4 END,
+            pg_get_expr(ad.adbin, ad.adrelid),
+            CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END
+        FROM
+            pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+        WHERE
+            n.nspname = 'public' AND
+            c.relkind IN {TABLE_RELKINDS} AND
+            c.relname = %s AND
+            a.attnum > 0 AND
+            NOT a.attisdropped
+        ORDER BY
+            a.attnum
         """
         
         columns = execute_query(column_query, (table_name,))
@@ -67,24 +303,25 @@ class SchemaTool:
         # Get constraint information (primary keys, foreign keys, etc.)
         constraint_query = """
         SELECT
-            tc.constraint_name,
-            tc.constraint_type,
-            kcu.column_name,
-            ccu.table_name AS foreign_table_name,
-            ccu.column_name AS foreign_column_name
+            con.conname,
+            CASE con.contype WHEN 'p' THEN 'PRIMARY KEY' WHEN 'u' THEN 'UNIQUE' ELSE 'FOREIGN KEY' END,
+            a.attname,
+            fc.relname AS foreign_table_name,
+            fa.attname AS foreign_column_name
         FROM
-            information_schema.table_constraints AS tc
-            JOIN information_schema.key_column_usage AS kcu
-              ON tc.constraint_name = kcu.constraint_name
-              AND tc.table_schema = kcu.table_schema
-            LEFT JOIN information_schema.constraint_column_usage AS ccu
-              ON ccu.constraint_name = tc.constraint_name
-              AND ccu.table_schema = tc.table_schema
+            pg_constraint con
+            JOIN pg_class c ON c.oid = con.conrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(attnum, foreign_attnum)
+            JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+            LEFT JOIN pg_class fc ON fc.oid = con.confrelid
+            LEFT JOIN pg_attribute fa ON fa.attrelid = con.confrelid AND fa.attnum = k.foreign_attnum
         WHERE
-            tc.table_schema = 'public' AND
-            tc.table_name = %s
+            n.nspname = 'public' AND
+            c.relname = %s AND
+            con.contype IN ('p', 'u', 'f')
         ORDER BY
-            tc.constraint_name, kcu.column_name
+            con.conname, a.attname
         """
         
         constraints = execute_query(constraint_query, (table_name,))
@@ -92,23 +329,88 @@ class SchemaTool:
         # Get index information
         index_query = """
         SELECT
-            indexname,
-            indexdef
+            i.relname,
+            pg_get_indexdef(i.oid)
         FROM
-            pg_indexes
+            pg_index x
+            JOIN pg_class c ON c.oid = x.indrelid
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
         WHERE
-            schemaname = 'public' AND
-            tablename = %s
+            n.nspname = 'public' AND
+            c.relname = %s
         ORDER BY
-            indexname
+            i.relname
         """
         
         indexes = execute_query(index_query, (table_name,))
         
-        # Get row count
-        count_query = f"SELECT COUNT(*) FROM {table_name}"
-        row_count = execute_query(count_query)[0][0]
+        # Get row count, from the planner's estimate unless asked to be exact
+        if exact:
+            row_count = self._count_rows(table_name)
+        else:
+            estimate_query = """
+            SELECT c.relkind, c.reltuples::bigint
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relname = %s
+            """
+            estimate = execute_query(estimate_query, (table_name,))
+            row_count = self._row_count(table_name, *estimate[0]) if estimate else None
+        
+        return self._build_table_info(table_name, row_count, columns, constraints, indexes)
+    
+    def get_row_counts(self) -> Dict[str, int]:
+        """
+        Get the row count of every table in the database.
+        
+        Counts are the planner's estimates; tables that were never analyzed
+        are counted exactly. Views, partitioned and foreign tables have no
+        row count and are omitted.
         
+        Returns:
+            dict: Dictionary with table names as keys and row counts as values
+        """
+        return _cached((DB_NAME, "row_counts"), self._load_row_counts)
+    
+    def _load_row_counts(self) -> Dict[str, int]:
+        """Query the database for the row counts of the public tables."""
+        row_counts = {}
+        for table_name, relkind, estimate in execute_query(ROW_ESTIMATE_QUERY):
+            row_count = self._row_count(table_name, relkind, estimate)
+            if row_count is not None:
+                row_counts[table_name] = row_count
+        return row_counts
+    
+    def _row_count(self, table_name: str, relkind: str, estimate: int) -> Optional[int]:
+        """
+        Resolve a table's row count from its planner estimate.
+        
+        Returns:
+            int or None: The estimate, an exact count if the table was never
+            analyzed, or None for relations whose rows aren't stored in them
+            (views, partitioned and foreign tables), which would be expensive
+            or impossible to count
+        """
+        if relkind != "r":
+            return None
+        if estimate < 0:
+            return self._count_rows(table_name)
+        return estimate
+    
+    def _count_rows(self, table_name: str) -> int:
+        """Count the rows of a table exactly."""
+        return execute_query(f"SELECT COUNT(*) FROM {table_name}")[0][0]
+    
+    def _build_table_info(
+        self,
+        table_name: str,
+        row_count: Optional[int],
+        columns: List[Tuple],
+        constraints: List[Tuple],
+        indexes: List[Tuple]
+    ) -> Dict[str, Any]:
+        """Assemble the schema information dict of a table from its introspection rows."""
         # Process column information
         columns_info = []
         for col in columns:
@@ -159,11 +461,107 @@ class SchemaTool:
         Returns:
             dict: Dictionary with table names as keys and schema info as values
         """
-        tables = self.get_tables()
-        schemas = {}
+        return _cached((DB_NAME, "all_schemas"), self._bulk_load_public_schema)
+    
+    def _bulk_load_public_schema(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Query the schema information of every public table at once.
         
-        for table_name in tables:
-            schemas[table_name] = self.get_table_info(table_name)
+        Runs four schema-wide queries (columns, constraints, indexes and row
+        estimates) concurrently instead of four queries per table, then groups
+        the rows by table. Row counts are resolved as in get_row_counts, and
+        are None for tables without one.
+        """
+        column_query = f"""
+        SELECT
+            c.relname,
+            a.attname,
+            format_type(a.atttypid, NULL),
+            CASE WHEN a.atttypid IN ('varchar'::regtype, 'bpchar'::regtype) AND a.atttypmod > 0
+                 THEN a.atttypmod - 4 END,
+            pg_get_expr(ad.adbin, ad.adrelid),
+            CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END
+        FROM
+            pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+        WHERE
+            n.nspname = 'public' AND
+            c.relkind IN {TABLE_RELKINDS} AND
+            a.attnum > 0 AND
+            NOT a.attisdropped
+        ORDER BY
+            c.relname, a.attnum
+        """
+        
+        constraint_query = """
+        SELECT
+            c.relname,
+            con.conname,
+            CASE con.contype WHEN 'p' THEN 'PRIMARY KEY' WHEN 'u' THEN 'UNIQUE' ELSE 'FOREIGN KEY' END,
+            a.attname,
+            fc.relname AS foreign_table_name,
+            fa.attname AS foreign_column_name
+        FROM
+            pg_constraint con
+            JOIN pg_class c ON c.oid = con.conrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(attnum, foreign_attnum)
+            JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+            LEFT JOIN pg_class fc ON fc.oid = con.confrelid
+            LEFT JOIN pg_attribute fa ON fa.attrelid = con.confrelid AND fa.attnum = k.foreign_attnum
+        WHERE
+            n.nspname = 'public' AND
+            con.contype IN ('p', 'u', 'f')
+        ORDER BY
+            c.relname, con.conname, a.attname
+        """
+        
+        index_query = """
+        SELECT
+            c.relname,
+            i.relname,
+            pg_get_indexdef(i.oid)
+        FROM
+            pg_index x
+            JOIN pg_class c ON c.oid = x.indrelid
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE
+            n.nspname = 'public'
+        ORDER BY
+            c.relname, i.relname
+        """
+        
+        # The queries are independent, so run them concurrently on the pool
+        queries = [column_query, constraint_query, index_query, ROW_ESTIMATE_QUERY]
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            column_rows, constraint_rows, index_rows, count_rows = executor.map(execute_query, queries)
+        
+        columns = defaultdict(list)
+        for row in column_rows:
+            columns[row[0]].append(row[1:])
+        
+        constraints = defaultdict(list)
+        for row in constraint_rows:
+            constraints[row[0]].append(row[1:])
+        
+        indexes = defaultdict(list)
+        for row in index_rows:
+            indexes[row[0]].append(row[1:])
+        
+        row_estimates = {table_name: (relkind, estimate) for table_name, relkind, estimate in count_rows}
+        
+        schemas = {}
+        for table_name in self.get_tables():
+            row_count = None
+            if table_name in row_estimates:
+                row_count = self._row_count(table_name, *row_estimates[table_name])
+            
+            schemas[table_name] = self._build_table_info(
+                table_name, row_count, columns[table_name], constraints[table_name], indexes[table_name]
+            )
         
         return schemas
     
@@ -174,43 +572,41 @@ class SchemaTool:
         Returns:
             dict: Dictionary with table names as keys and lists of related tables
         """
+        return _cached((DB_NAME, "relationships"), self._load_table_relationships)
+    
+    def _load_table_relationships(self) -> Dict[str, List[Dict[str, str]]]:
+        """Query the database for foreign key relationships between public tables."""
         query = """
         SELECT
-            tc.table_name AS table_name,
-            kcu.column_name AS column_name,
-            ccu.table_name AS foreign_table_name,
-            ccu.column_name AS foreign_column_name
+            c.relname AS table_name,
+            a.attname AS column_name,
+            fc.relname AS foreign_table_name,
+            fa.attname AS foreign_column_name
         FROM
-            information_schema.table_constraints AS tc
-            JOIN information_schema.key_column_usage AS kcu
-              ON tc.constraint_name = kcu.constraint_name
-              AND tc.table_schema = kcu.table_schema
-            JOIN information_schema.constraint_column_usage AS ccu
-              ON ccu.constraint_name = tc.constraint_name
-              AND ccu.table_schema = tc.table_schema
+            pg_constraint con
+            JOIN pg_class c ON c.oid = con.conrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(attnum, foreign_attnum)
+            JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+            JOIN pg_class fc ON fc.oid = con.confrelid
+            JOIN pg_attribute fa ON fa.attrelid = con.confrelid AND fa.attnum = k.foreign_attnum
         WHERE
-            tc.constraint_type = 'FOREIGN KEY' AND
-            tc.table_schema = 'public'
+            con.contype = 'f' AND
+            n.nspname = 'public'
         ORDER BY
-            tc.table_name, kcu.column_name
+            c.relname, a.attname
         """
         
-        results = execute_query(query)
-        
-        relationships = {}
-        for row in results:
-            table, column, foreign_table, foreign_column = row
-            
-            if table not in relationships:
-                relationships[table] = []
-            
+        # Group the rows as they stream in rather than fetching them all first
+        relationships = defaultdict(list)
+        for table, column, foreign_table, foreign_column in execute_query_stream(query, name="relationships"):
             relationships[table].append({
                 "column": column,
                 "references_table": foreign_table,
                 "references_column": foreign_column
             })
         
-        return relationships
+        return dict(relationships)
     
     def format_table_schema(self, table_name: str) -> str:
         """
@@ -226,47 +622,44 @@ class SchemaTool:
             schema = self.get_table_info(table_name)
             
             # Format the output
-            output = f"# Table: {table_name}\n\n"
-            output += f"Row count: {schema['row_count']}\n\n"
+            parts: List[str] = [f"# Table: {table_name}\n\n"]
+            if schema["row_count"] is not None:
+                parts.append(f"Row count: {schema['row_count']}\n\n")
             
             # Columns
-            output += "## Columns\n\n"
-            output += "| Column | Type | Nullable | Default | Description |\n"
-            output += "|--------|------|----------|---------|-------------|\n"
+            parts.append("## Columns\n\n")
+            parts.append("| Column | Type | Nullable | Default | Description |\n")
+            parts.append("|--------|------|----------|---------|-------------|\n")
             
-            for column in schema["columns"]:
-                nullable = "YES" if column["nullable"] else "NO"
-                default = column["default"] or ""
-                type_info = column["type"]
-                if column["max_length"]:
-                    type_info += f"({column['max_length']})"
-                
-                output += f"| {column['name']} | {type_info} | {nullable} | {default} | |\n"
+            parts.append("".join(
+                f"| {column['name']} | {_type_info(column)} | {'YES' if column['nullable'] else 'NO'} "
+                f"| {column['default'] or ''} | |\n"
+                for column in schema["columns"]
+            ))
             
             # Constraints
             if schema["constraints"]:
-                output += "\n## Constraints\n\n"
-                output += "| Name | Type | Column | References |\n"
-                output += "|------|------|--------|------------|\n"
+                parts.append("\n## Constraints\n\n")
+                parts.append("| Name | Type | Column | References |\n")
+                parts.append("|------|------|--------|------------|\n")
                 
-                for constraint in schema["constraints"]:
-                    constraint_type = constraint["type"]
-                    refs = ""
-                    if constraint["foreign_table"] and constraint["foreign_column"]:
-                        refs = f"{constraint['foreign_table']}({constraint['foreign_column']})"
-                    
-                    output += f"| {constraint['name']} | {constraint_type} | {constraint['column']} | {refs} |\n"
+                parts.append("".join(
+                    f"| {constraint['name']} | {constraint['type']} | {constraint['column']} "
+                    f"| {_reference(constraint)} |\n"
+                    for constraint in schema["constraints"]
+                ))
             
             # Indexes
             if schema["indexes"]:
-                output += "\n## Indexes\n\n"
-                output += "| Name | Definition |\n"
-                output += "|------|------------|\n"
+                parts.append("\n## Indexes\n\n")
+                parts.append("| Name | Definition |\n")
+                parts.append("|------|------------|\n")
                 
-                for idx in schema["indexes"]:
-                    output += f"| {idx['name']} | {idx['definition']} |\n"
+                parts.append("".join(
+                    f"| {idx['name']} | {idx['definition']} |\n" for idx in schema["indexes"]
+                ))
             
-            return output
+            return "".join(parts)
             
         except Exception as e:
             return f"Error retrieving schema for table '{table_name}': {str(e)}"
@@ -280,25 +673,29 @@ class SchemaTool:
         """
         try:
             tables = self.get_tables()
+            row_counts = self.get_row_counts()
             relationships = self.get_table_relationships()
             
-            output = "# Database Schema Summary\n\n"
+            parts: List[str] = ["# Database Schema Summary\n\n"]
             
             # Tables overview
-            output += f"## Tables ({len(tables)})\n\n"
-            for table in tables:
-                row_count = self.get_table_info(table)["row_count"]
-                output += f"- **{table}** ({row_count} rows)\n"
+            parts.append(f"## Tables ({len(tables)})\n\n")
+            parts.append("".join(
+                f"- **{table}** ({row_counts[table]} rows)\n" if table in row_counts else f"- **{table}**\n"
+                for table in tables
+            ))
             
             # Relationships overview
-            output += "\n## Relationships\n\n"
+            parts.append("\n## Relationships\n\n")
             for table, relations in relationships.items():
                 if relations:
-                    output += f"### {table}\n\n"
-                    for relation in relations:
-                        output += f"- {table}.{relation['column']} → {relation['references_table']}.{relation['references_column']}\n"
+                    parts.append(f"### {table}\n\n")
+                    parts.append("".join(
+                        f"- {table}.{relation['column']} → {relation['references_table']}.{relation['references_column']}\n"
+                        for relation in relations
+                    ))
             
-            return output
+            return "".join(parts)
             
         except Exception as e:
             return f"Error generating schema summary: {str(e)}" 
\ No newline at end of file
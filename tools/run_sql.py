@@ -1,75 +1,75 @@
 """Tool for executing SQL queries on the PostgreSQL database."""
 
-import os
-import sys
-import pandas as pd
-from typing import Optional, Dict, Any, List, Union
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple, Union
+
+from db.connection import execute_query, execute_query_with_description
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Type OIDs of PostgreSQL's numeric types: int8, int2, int4, float4, float8, numeric
+NUMERIC_TYPE_OIDS = frozenset({20, 21, 23, 700, 701, 1700})
+
+
+def _to_markdown(df: "pd.DataFrame") -> str:
+    """Render a DataFrame as a markdown table, without the index."""
+    def cell(value: Any) -> str:
+        return "" if value is None else str(value).replace("|", "\\|").replace("\n", " ")
+    
+    lines = [
+        "| " + " | ".join(cell(col) for col in df.columns) + " |",
+        "|" + "|".join("---" for _ in df.columns) + "|"
+    ]
+    lines.extend(
+        "| " + " | ".join(cell(value) for value in row) + " |"
+        for row in df.itertuples(index=False, name=None)
+    )
+    return "\n".join(lines)
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from db.connection import execute_query, test_connection
 
 class SQLTool:
-    """Tool for executing SQL queries and processing results."""
+    """
+    Tool for executing SQL queries and processing results.
     
-    def __init__(self):
-        """Initialize the SQL tool."""
-        # Test database connection
-        if not test_connection():
-            raise ConnectionError("Failed to connect to the database. Please check your connection settings.")
+    Queries run on the shared connection pool, so creating a tool doesn't
+    touch the database; connection problems are reported by run().
+    """
     
-    def run(self, query: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def run(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        return_dataframe: bool = False,
+        preview_rows: int = 10,
+        compute_stats: bool = True
+    ) -> Dict[str, Any]:
         """
         Execute a SQL query and return the results.
         
         Args:
             query (str): SQL query to execute
             params (dict, optional): Parameters for the query
+            return_dataframe (bool, optional): Return the rows as a DataFrame
+                under 'data' instead of a list of records
+            preview_rows (int, optional): Number of rows in the markdown preview
+            compute_stats (bool, optional): Whether to compute statistics for
+                numeric columns
             
         Returns:
             dict: Dictionary containing query results and metadata
         """
         try:
             # Execute the query
-            results = execute_query(query, params)
+            df, numeric_columns = self._fetch(query, params)
             
             # Process results if any
-            if results:
-                # Extract column names from the first row's keys
-                if hasattr(results[0], '_fields'):
-                    # Handle SQLAlchemy result proxy
-                    columns = results[0]._fields
-                    data = [list(row) for row in results]
-                else:
-                    # Handle raw tuple results
-                    try:
-                        # Try to infer column names from the query
-                        # This is a simple approach and may not work for complex queries
-                        column_part = query.lower().split("select")[1].split("from")[0].strip()
-                        columns = [c.strip().split(' ')[-1] for c in column_part.split(',')]
-                        # Remove any alias prefixes (table.column -> column)
-                        columns = [c.split('.')[-1] for c in columns]
-                    except:
-                        # Fallback to generic column names
-                        columns = [f"column_{i}" for i in range(len(results[0]))]
-                    
-                    data = [list(row) for row in results]
-                
-                # Convert to pandas DataFrame for easier processing
-                df = pd.DataFrame(data, columns=columns)
-                
+            if df is not None:
                 # Calculate basic statistics for numeric columns
-                stats = {}
-                for col in df.select_dtypes(include=['number']).columns:
-                    stats[col] = {
-                        'min': df[col].min(),
-                        'max': df[col].max(),
-                        'mean': df[col].mean(),
-                        'median': df[col].median()
-                    }
+                stats = self._statistics(df, numeric_columns) if compute_stats else {}
                 
                 # Generate preview table formatted as markdown
-                preview = df.head(10).to_markdown(index=False) if len(df) > 0 else "No results"
+                preview = _to_markdown(df.head(preview_rows)) if len(df) > 0 else "No results"
                 
                 # Return detailed response
                 return {
@@ -77,7 +77,7 @@ class SQLTool:
                     'row_count': len(df),
                     'columns': list(df.columns),
                     'preview': preview,
-                    'data': df.to_dict(orient='records'),
+                    'data': df if return_dataframe else df.to_dict(orient='records'),
                     'statistics': stats
                 }
             
@@ -96,6 +96,121 @@ class SQLTool:
                 'query': query
             }
     
+    def run_preview(self, query: str, params: Optional[Dict[str, Any]] = None, n: int = 10) -> Dict[str, Any]:
+        """
+        Execute a SELECT query, fetching only a preview and computing the rest in the database.
+        
+        Only the first `n` rows are sent back; the row count and the numeric
+        column statistics are computed server-side in a single scan.
+        
+        Args:
+            query (str): SELECT query to execute
+            params (dict, optional): Parameters for the query
+            n (int, optional): Number of preview rows to fetch
+            
+        Returns:
+            dict: Dictionary with the same keys as run(), where 'data' holds
+            only the preview rows
+        """
+        try:
+            subquery = query.strip().rstrip(";")
+            # The newline keeps a trailing "-- comment" from swallowing the wrapper
+            df, numeric_columns = self._fetch(f"SELECT * FROM ({subquery}\n) _sub LIMIT {int(n)}", params)
+            if df is None:
+                return {
+                    'success': True,
+                    'row_count': 0,
+                    'message': 'Query executed successfully, but no results were returned.'
+                }
+            
+            row_count, stats = self._aggregate(subquery, params, numeric_columns)
+            
+            return {
+                'success': True,
+                'row_count': row_count,
+                'columns': list(df.columns),
+                'preview': _to_markdown(df),
+                'data': df.to_dict(orient='records'),
+                'statistics': stats
+            }
+            
+        except Exception as e:
+            # Return error information
+            return {
+                'success': False,
+                'error': str(e),
+                'query': query
+            }
+    
+    def _fetch(self, query: str, params: Optional[Dict[str, Any]]) -> Tuple[Optional["pd.DataFrame"], List[str]]:
+        """
+        Execute a query and load its rows into a DataFrame.
+        
+        Returns:
+            tuple: The DataFrame (None if no rows came back) and the names of
+            the columns with a numeric database type
+        """
+        results, description = execute_query_with_description(query, params)
+        if not results:
+            return None, []
+        
+        columns = [col.name for col in description]
+        numeric_columns = [col.name for col in description if col.type_code in NUMERIC_TYPE_OIDS]
+        
+        # pandas is only needed once there are rows, so empty results and
+        # statements skip its import cost
+        import pandas as pd
+        
+        # Build the DataFrame straight from the result rows
+        return pd.DataFrame.from_records(results, columns=columns), numeric_columns
+    
+    def _aggregate(
+        self,
+        subquery: str,
+        params: Optional[Dict[str, Any]],
+        numeric_columns: List[str]
+    ) -> Tuple[int, Dict[str, Dict[str, float]]]:
+        """
+        Compute a query's row count and numeric column statistics in one database scan.
+        
+        Returns:
+            tuple: Row count and a statistics dict per numeric column
+        """
+        aggregates = ["COUNT(*)"]
+        for col in numeric_columns:
+            quoted = '"' + str(col).replace('"', '""') + '"'
+            aggregates += [
+                f"MIN({quoted})",
+                f"MAX({quoted})",
+                f"AVG({quoted})",
+                f"PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY {quoted})"
+            ]
+        
+        row = execute_query(f"SELECT {', '.join(aggregates)} FROM ({subquery}\n) _sub", params)[0]
+        
+        stats = {}
+        for i, col in enumerate(numeric_columns):
+            # NULL aggregates (all-NULL columns) become NaN, as in pandas
+            values = [float("nan") if v is None else float(v) for v in row[1 + 4 * i:5 + 4 * i]]
+            stats[col] = dict(zip(('min', 'max', 'mean', 'median'), values))
+        
+        return row[0], stats
+    
+    def _statistics(self, df: "pd.DataFrame", numeric_columns: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Compute statistics of the numeric columns from the fetched rows.
+        
+        Columns are chosen by database type, so NUMERIC columns (fetched as
+        Decimal) are included just as they are by _aggregate; agg computes
+        every statistic of every column in one call.
+        """
+        if not numeric_columns:
+            return {}
+        
+        # Duplicate column names would otherwise be selected twice
+        numeric = df[list(dict.fromkeys(numeric_columns))].astype(float)
+        return numeric.agg(['min', 'max', 'mean', 'median']).to_dict()
+    
     def run_and_format(self, query: str, params: Optional[Dict[str, Any]] = None) -> str:
         """
         Execute a SQL query and return results formatted for display in a markdown report.
@@ -107,7 +222,8 @@ class SQLTool:
         Returns:
             str: Markdown formatted results
         """
-        result = self.run(query, params)
+        # Only the preview and statistics are shown, so skip building records
+        result = self.run(query, params, return_dataframe=True)
         
         if not result['success']:
             return f"❌ Query error: {result['error']}"
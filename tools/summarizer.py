@@ -1,15 +1,12 @@
 """Tool for summarizing data using Google's Gemini API."""
 
 import os
-import sys
-import json
+import asyncio
+import orjson
 import google.generativeai as genai
 from typing import Dict, List, Any, Optional, Union
 from dotenv import load_dotenv
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 # Load environment variables
 load_dotenv()
 
@@ -22,30 +19,8 @@ if not GEMINI_API_KEY:
 genai.configure(api_key=GEMINI_API_KEY)
 
 
-class SummarizerTool:
-    """Tool for summarizing data using Google's Gemini API."""
-    
-    def __init__(self, model_name: str = "gemini-1.5-pro"):
-        """
-        Initialize the summarizer tool.
-        
-        Args:
-            model_name (str): Name of the Gemini model to use
-        """
-        self.model_name = model_name
-        self.model = genai.GenerativeModel(model_name)
-        
-        # Load default summarizer prompt
-        prompt_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            "prompts/summarizer_prompt.txt"
-        )
-        
-        try:
-            with open(prompt_path, "r") as file:
-                self.default_prompt = file.read()
-        except FileNotFoundError:
-            self.default_prompt = """
+# Prompt used when no custom prompt is given
+_FALLBACK_PROMPT = """
             You are a data analyst specialized in marketing and sales data.
             Analyze the following data and provide a clear, concise summary of the key insights.
             Focus on identifying anomalies, trends, and potential root causes.
@@ -62,6 +37,54 @@ class SummarizerTool:
             DATA:
             {data}
             """
+
+
+def _load_default_prompt() -> str:
+    """Read the default summarizer prompt, falling back to the built-in one."""
+    prompt_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "prompts/summarizer_prompt.txt"
+    )
+    
+    try:
+        with open(prompt_path, "r") as file:
+            return file.read()
+    except FileNotFoundError:
+        return _FALLBACK_PROMPT
+
+
+# orjson options for the data payload; values orjson can't serialize
+# natively (e.g. Decimal query results) fall back to str()
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Placeholder that the data is spliced into
+DATA_PLACEHOLDER = "{data}"
+
+# Default prompt, read once at import
+DEFAULT_PROMPT = _load_default_prompt()
+
+# Default prompt pre-split around the data placeholder
+DEFAULT_PROMPT_PARTS = tuple(DEFAULT_PROMPT.split(DATA_PLACEHOLDER))
+
+# Model clients shared by all SummarizerTool instances, keyed by model name
+_MODEL_CACHE: Dict[str, genai.GenerativeModel] = {}
+
+
+class SummarizerTool:
+    """Tool for summarizing data using Google's Gemini API."""
+    
+    def __init__(self, model_name: str = "gemini-1.5-pro"):
+        """
+        Initialize the summarizer tool.
+        
+        Args:
+            model_name (str): Name of the Gemini model to use
+        """
+        self.model_name = model_name
+        if model_name not in _MODEL_CACHE:
+            _MODEL_CACHE[model_name] = genai.GenerativeModel(model_name)
+        self.model = _MODEL_CACHE[model_name]
+        self.default_prompt = DEFAULT_PROMPT
     
     def summarize(
         self, 
@@ -80,28 +103,111 @@ class SummarizerTool:
         Returns:
             str: Generated summary
         """
-        # Convert data to string if it's a dict or list
+        prompt = self._build_prompt(data, custom_prompt, context)
+        
+        # Generate summary
+        try:
+            response = self.model.generate_content(prompt)
+            return response.text
+        except Exception as e:
+            return f"Error generating summary: {str(e)}"
+    
+    async def summarize_async(
+        self, 
+        data: Union[Dict, List, str],
+        custom_prompt: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> str:
+        """
+        Summarize data using Gemini without blocking the event loop.
+        
+        Args:
+            data: Data to summarize (dict, list, or str)
+            custom_prompt: Optional custom prompt to use
+            context: Optional context to add to the prompt
+            
+        Returns:
+            str: Generated summary
+        """
+        prompt = self._build_prompt(data, custom_prompt, context)
+        
+        try:
+            response = await self.model.generate_content_async(prompt)
+            return response.text
+        except Exception as e:
+            return f"Error generating summary: {str(e)}"
+    
+    def summarize_batch(
+        self,
+        items: List[Union[Dict, List, str]],
+        custom_prompt: Optional[str] = None,
+        context: Optional[str] = None,
+        concurrency: int = 8
+    ) -> List[str]:
+        """
+        Summarize several data items concurrently.
+        
+        Must be called outside a running event loop; async callers should
+        gather summarize_async themselves.
+        
+        Args:
+            items: Data items to summarize
+            custom_prompt: Optional custom prompt to use for every item
+            context: Optional context to add to every prompt
+            concurrency: Maximum number of requests in flight, to stay within
+                the Gemini rate limit
+            
+        Returns:
+            list: Generated summaries, in the order of the items
+        """
+        async def run_all() -> List[str]:
+            semaphore = asyncio.Semaphore(concurrency)
+            
+            async def summarize_one(item: Union[Dict, List, str]) -> str:
+                async with semaphore:
+                    return await self.summarize_async(item, custom_prompt, context)
+            
+            return await asyncio.gather(*(summarize_one(item) for item in items))
+        
+        return asyncio.run(run_all())
+    
+    def _build_prompt(
+        self,
+        data: Union[Dict, List, str],
+        custom_prompt: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> List[str]:
+        """
+        Fill the prompt template with the data and optional context.
+        
+        The prompt is returned as content parts around the data instead of one
+        spliced string, so large payloads aren't copied into the prompt text.
+        """
+        # Convert data to compact JSON if it's a dict or list; the model
+        # doesn't need the indentation and it costs tokens
         if isinstance(data, (dict, list)):
-            data_str = json.dumps(data, indent=2)
+            data_str = orjson.dumps(data, option=_JSON_OPTIONS, default=str).decode()
         else:
             data_str = str(data)
         
-        # Prepare prompt
+        # Prepare prompt, reusing the pre-split default when it applies
         prompt = custom_prompt if custom_prompt else self.default_prompt
+        if prompt is DEFAULT_PROMPT:
+            pieces = list(DEFAULT_PROMPT_PARTS)
+        else:
+            pieces = prompt.split(DATA_PLACEHOLDER)
         
         # Add context if provided
         if context:
-            prompt = f"{prompt}\n\nADDITIONAL CONTEXT:\n{context}"
+            pieces[-1] = f"{pieces[-1]}\n\nADDITIONAL CONTEXT:\n{context}"
         
-        # Replace placeholder with actual data
-        prompt = prompt.replace("{data}", data_str)
+        # Put the data wherever the placeholder was
+        parts = [pieces[0]]
+        for piece in pieces[1:]:
+            parts += [data_str, piece]
         
-        # Generate summary
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error generating summary: {str(e)}"
+        # Empty text parts are rejected by the API
+        return [part for part in parts if part]
     
     def analyze_metrics(
         self,
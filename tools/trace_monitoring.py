@@ -1,18 +1,33 @@
-from langtrace_python_sdk import langtrace # Must precede any llm module imports
+"""Optional Langtrace instrumentation of the LLM SDKs, enabled with KPI_AGENT_TRACE=1."""
 
-langtrace.init(api_key = 'API_KEY_HERE')
+import os
 
-from openai import OpenAI
-client = OpenAI()
+# Langtrace patches every LLM SDK call, so it is only loaded when asked for.
+# Must precede any llm module imports.
+if os.getenv("KPI_AGENT_TRACE") == "1":
+    from langtrace_python_sdk import langtrace
 
-completion = client.chat.completions.create(
-    model="gpt-4o",
-    messages=[
-        {
-            "role": "user",
-            "content": "Tell me about Emperor Caracalla"
-        }
-    ]
-)
+    langtrace.init(api_key=os.getenv("LANGTRACE_API_KEY"))
 
-print(completion.choices[0].message.content)
\ No newline at end of file
+
+def _smoke_test() -> None:
+    """Send a single chat completion so a trace shows up in Langtrace."""
+    from openai import OpenAI
+    client = OpenAI()
+
+    completion = client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {
+                "role": "user",
+                "content": "Tell me about Emperor Caracalla"
+            }
+        ]
+    )
+
+    print(completion.choices[0].message.content)
+
+
+if __name__ == "__main__":
+    # python -m tools.trace_monitoring, with KPI_AGENT_TRACE=1 to trace it
+    _smoke_test()